@@ -0,0 +1,48 @@
+import pytest
+from conftest import point_collectors_at
+
+pytest.importorskip("fastapi")
+
+@pytest.fixture(scope="module")
+def backend(workdir, upstream):
+    # main creates its stores and collectors at import, so import it inside the scratch directory
+    import main
+    point_collectors_at(upstream, gdacs=main.gdacs, weather=main.weather, osm=main.osm, cwc=main.cwc)
+    return main
+
+def bench_run_collection_task(benchmark, backend):
+    """One full sync cycle against the stub upstreams; the warm-up round trains or loads the predictor."""
+    benchmark.pedantic(backend.run_collection_task, rounds=5, iterations=1, warmup_rounds=1)
+    snapshot = backend.load_data()
+    assert snapshot["alerts"] and not snapshot["stale_sources"]
+
+def bench_gdacs_cold(benchmark, workdir, upstream, tmp_path):
+    """GDACS fetch with an empty episode index, so every feature is classified."""
+    from collectors.gdacs_collector import GDACSCollector
+
+    def setup():
+        index = tmp_path / f"gdacs_{setup.round}.json"
+        setup.round += 1
+        collector = GDACSCollector(index_path=str(index))
+        point_collectors_at(upstream, gdacs=collector)
+        return (collector,), {}
+    setup.round = 0
+
+    events = benchmark.pedantic(lambda collector: collector.fetch_data(), setup=setup, rounds=10)
+    assert events
+
+@pytest.mark.parametrize("points", [10, 100, 500])
+def bench_weather_batch(benchmark, workdir, upstream, points):
+    from collectors.weather_collector import WeatherCollector
+    collector = WeatherCollector()
+    point_collectors_at(upstream, weather=collector)
+    coords = [(8 + (i % 29), 68 + (i % 30)) for i in range(points)]
+    benchmark.extra_info["points"] = points
+    results = benchmark(collector.fetch_weather_batch, coords)
+    assert all(results)
+
+def bench_osm_live_query(benchmark, workdir, upstream):
+    from collectors.osm_collector import OSMCollector
+    collector = OSMCollector()
+    point_collectors_at(upstream, osm=collector)
+    assert benchmark(collector.fetch_infrastructure, 28.61, 77.20)
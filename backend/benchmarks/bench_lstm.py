@@ -0,0 +1,55 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+lstm_model = pytest.importorskip("ml_service.lstm_model")
+
+# 1M rows needs a few GB of RAM; lower the ceiling with BENCH_MAX_ROWS
+MAX_ROWS = int(os.environ.get("BENCH_MAX_ROWS", 1_000_000))
+ROW_COUNTS = [n for n in (10_000, 100_000, 1_000_000) if n <= MAX_ROWS]
+
+def synthetic_data(n_rows, seed=0):
+    """Tourist pings around a few hubs plus one alert per hundred pings, shaped like the Firestore documents."""
+    rng = np.random.default_rng(seed)
+    hubs = np.array([(28.61, 77.20), (19.07, 72.87), (13.08, 80.27), (26.14, 91.74), (9.93, 76.26)])
+    hub = hubs[rng.integers(len(hubs), size=n_rows)]
+    lat = np.round(hub[:, 0] + rng.normal(0, 0.05, n_rows), 4)
+    lng = np.round(hub[:, 1] + rng.normal(0, 0.05, n_rows), 4)
+    start = pd.Timestamp("2026-01-01")
+    tourists = pd.DataFrame({
+        "location": [{"lat": a, "lng": b} for a, b in zip(lat, lng)],
+        "lastUpdate": start + pd.to_timedelta(np.sort(rng.integers(0, 180 * 86400, n_rows)), unit="s"),
+    })
+    n_alerts = max(1, n_rows // 100)
+    alert_hub = hubs[rng.integers(len(hubs), size=n_alerts)]
+    alerts = pd.DataFrame({
+        "location": [{"lat": a, "lng": b} for a, b in alert_hub + rng.normal(0, 0.05, (n_alerts, 2))],
+        "timestamp": start + pd.to_timedelta(rng.integers(0, 180 * 86400, n_alerts), unit="s"),
+        "type": rng.choice(["sos", "geofence", "medical"], n_alerts),
+        "priority": rng.choice(["low", "medium", "high", "critical"], n_alerts),
+    })
+    return tourists, alerts
+
+@pytest.mark.parametrize("n_rows", ROW_COUNTS)
+def bench_preprocess_data(benchmark, n_rows):
+    tourists, alerts = synthetic_data(n_rows)
+    model = lstm_model.TouristSafetyLSTM()
+
+    def setup():
+        # preprocess_data adds columns in place
+        return ({"tourists": tourists.copy(), "alerts": alerts.copy(), "zones": pd.DataFrame()},), {}
+
+    benchmark.extra_info["rows"] = n_rows
+    processed, _ = benchmark.pedantic(model.preprocess_data, setup=setup, rounds=3)
+    assert len(processed) == n_rows
+
+@pytest.mark.parametrize("n_rows", ROW_COUNTS)
+def bench_create_sequences(benchmark, n_rows):
+    tourists, alerts = synthetic_data(n_rows)
+    model = lstm_model.TouristSafetyLSTM()
+    processed, _ = model.preprocess_data({"tourists": tourists, "alerts": alerts, "zones": pd.DataFrame()})
+
+    benchmark.extra_info["rows"] = n_rows
+    X, y = benchmark.pedantic(model.create_sequences, args=(processed,), rounds=3)
+    assert len(X) == len(y) == n_rows - model.sequence_length
@@ -0,0 +1,62 @@
+import os
+import shutil
+import resource
+import importlib.util
+import pytest
+from conftest import FIXTURES_DIR, point_collectors_at
+
+def _installed(module):
+    return importlib.util.find_spec(module) is not None
+
+needs_parser = pytest.mark.skipif(not (_installed("pdfplumber") or shutil.which("pdftotext")),
+                                  reason="needs pdfplumber or poppler's pdftotext")
+needs_renderer = pytest.mark.skipif(not (_installed("pdf2image") and shutil.which("pdftoppm")),
+                                    reason="needs pdf2image and poppler")
+
+def _max_rss_mb(who):
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+@needs_renderer
+@pytest.mark.parametrize("dpi", [100, 150])
+def bench_render_pages(benchmark, workdir, tmp_path, dpi):
+    """Page rasterization across the process pool; peak RSS of the workers goes into extra_info."""
+    from collectors.pdf_manager import PDFManager
+    from collectors.artifact_cache import ArtifactCache
+    manager = PDFManager(storage_dir=str(tmp_path / "images"), dpi=dpi,
+                         artifact_cache=ArtifactCache(str(tmp_path / "artifacts.json")))
+    pdf_path = str(tmp_path / "bulletin.pdf")
+    shutil.copy(os.path.join(FIXTURES_DIR, "cwc_bulletin.pdf"), pdf_path)
+
+    pages = benchmark.pedantic(manager._render_pages, args=(pdf_path, lambda page, ext: f"p{page}.{ext}"), rounds=3)
+    benchmark.extra_info["pages"] = len(pages)
+    benchmark.extra_info["worker_max_rss_mb"] = round(_max_rss_mb(resource.RUSAGE_CHILDREN), 1)
+    benchmark.extra_info["parent_max_rss_mb"] = round(_max_rss_mb(resource.RUSAGE_SELF), 1)
+    assert pages
+
+@needs_parser
+def bench_parse_cwc_bulletin(benchmark):
+    from collectors.bulletin_parser import parse_cwc_bulletin
+    records = benchmark(parse_cwc_bulletin, os.path.join(FIXTURES_DIR, "cwc_bulletin.pdf"))
+    benchmark.extra_info["records"] = len(records)
+    assert records
+
+@needs_parser
+def bench_cwc_unchanged_bulletin(benchmark, workdir, upstream):
+    """Steady-state CWC collection: the bulletin answers 304 and cached records are reused."""
+    from collectors.cwc_collector import CWCCollector
+    collector = CWCCollector()
+    point_collectors_at(upstream, cwc=collector)
+    assert collector.fetch_data().get("stations")
+    result = benchmark(collector.fetch_data)
+    assert result.get("stations")
+
+@needs_renderer
+def bench_imd_unchanged_bulletin(benchmark, workdir, upstream):
+    """Steady-state IMD collection: the bulletin answers 304 and the rendered pages are reused."""
+    from collectors.imd_collector import IMDCollector
+    collector = IMDCollector()
+    point_collectors_at(upstream, imd=collector)
+    assert collector.fetch_data().get("images")
+    result = benchmark(collector.fetch_data)
+    assert result.get("images")
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from feature_store import FeatureTable
+from prediction_engine import DisasterPredictor
+
+@pytest.mark.parametrize("n_samples", [1000, 10000, 100000])
+def bench_train(benchmark, n_samples):
+    benchmark.extra_info["samples"] = n_samples
+    predictor = benchmark.pedantic(DisasterPredictor, kwargs={"n_samples": n_samples}, rounds=3, iterations=1)
+    assert predictor.model is not None
+
+@pytest.fixture(scope="module")
+def predictor():
+    return DisasterPredictor()
+
+def _table(n_states, seed=0):
+    rng = np.random.default_rng(seed)
+    values = np.column_stack([
+        rng.uniform(0, 250, n_states), rng.uniform(0, 7, n_states),
+        rng.uniform(0, 100, n_states), rng.uniform(0, 10, n_states),
+    ])
+    names = [f"Region {i}" for i in range(n_states)]
+    return names, FeatureTable(names, values, np.ones(values.shape, dtype=bool))
+
+@pytest.mark.parametrize("n_states", [8, 1000, 10000])
+def bench_predict_cold(benchmark, predictor, n_states):
+    """Throughput of scoring with an empty prediction cache."""
+    names, table = _table(n_states)
+
+    def setup():
+        predictor._prediction_cache.clear()
+        return (names, table), {}
+
+    benchmark.extra_info["rows"] = n_states
+    results = benchmark.pedantic(predictor.predict_states, setup=setup, rounds=10)
+    assert len(results) == n_states
+
+@pytest.mark.parametrize("n_states", [8, 1000])
+def bench_predict_cached(benchmark, predictor, n_states):
+    """Repeat requests between syncs, answered from the prediction cache."""
+    names, table = _table(n_states)
+    predictor.predict_states(names, table)
+    benchmark.extra_info["rows"] = n_states
+    assert len(benchmark(predictor.predict_states, names, table)) == n_states
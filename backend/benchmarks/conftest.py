@@ -0,0 +1,132 @@
+"""
+Offline benchmark suite. Every upstream (GDACS, Open-Meteo, Overpass, IMD, CWC) is
+replaced by a local stub server that serves the synthetic payloads in fixtures/.
+They mimic the shape and size of the real responses but are not captures of them;
+regenerate them with benchmarks/make_fixtures.py.
+
+Needs pytest and pytest-benchmark. Run from backend/:
+    python -m pytest benchmarks
+Each run is saved as JSON under benchmarks/results/; compare two runs with
+    pytest-benchmark --storage file://benchmarks/results compare 0001 0002
+"""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+def fixture_bytes(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Routes upstream paths to synthetic fixtures. PDFs honour If-None-Match like the real servers."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body, content_type, status=200, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _open_meteo(self, query):
+        # One synthetic location, replayed once per requested coordinate
+        point = json.loads(fixture_bytes("open_meteo_point.json"))
+        lats = query["latitude"][0].split(",")
+        lons = query["longitude"][0].split(",")
+        locations = [dict(point, latitude=float(lat), longitude=float(lon)) for lat, lon in zip(lats, lons)]
+        return json.dumps(locations[0] if len(locations) == 1 else locations).encode()
+
+    def _pdf(self, name):
+        body = fixture_bytes(name)
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+        if self.headers.get("If-None-Match") == etag:
+            self._send(b"", "application/pdf", status=304, etag=etag)
+        else:
+            self._send(body, "application/pdf", etag=etag)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/gdacs/events":
+            self._send(fixture_bytes("gdacs_events.json"), "application/json")
+        elif url.path == "/open-meteo/forecast":
+            self._send(self._open_meteo(parse_qs(url.query)), "application/json")
+        elif url.path == "/imd/bulletin.php":
+            self._send(fixture_bytes("imd_bulletin.html"), "text/html")
+        elif url.path == "/imd/all_india_forcast_bulletin.pdf":
+            self._pdf("imd_bulletin.pdf")
+        elif url.path.startswith("/cwc/en/daily-flood-bulletin-report-dated-"):
+            self._send(fixture_bytes("cwc_report.html"), "text/html")
+        elif url.path == "/cwc/files/cfcrcwcdfb.pdf":
+            self._pdf("cwc_bulletin.pdf")
+        else:
+            self._send(b"not found", "text/plain", status=404)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if urlparse(self.path).path == "/overpass/interpreter":
+            self._send(fixture_bytes("overpass.json"), "application/json")
+        else:
+            self._send(b"not found", "text/plain", status=404)
+
+@pytest.fixture(scope="session")
+def upstream():
+    """Base URL of the local stub server serving the synthetic upstream responses."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture(scope="session")
+def workdir(tmp_path_factory):
+    """
+    Scratch working directory with a copy of backend/assets. The backend writes its
+    data/, models/ and temp_pdfs/ relative to the working directory.
+    """
+    path = tmp_path_factory.mktemp("backend")
+    shutil.copytree(os.path.join(BACKEND_DIR, "assets"), os.path.join(path, "assets"),
+                    ignore=shutil.ignore_patterns("images"))
+    os.makedirs(os.path.join(path, "assets", "images"))
+    previous = os.getcwd()
+    os.chdir(path)
+    yield path
+    os.chdir(previous)
+
+def point_collectors_at(upstream, gdacs=None, weather=None, osm=None, cwc=None, imd=None):
+    """Redirects collector instances to the stub server."""
+    if gdacs is not None:
+        gdacs.api_url = f"{upstream}/gdacs/events"
+    if weather is not None:
+        weather.api_url = f"{upstream}/open-meteo/forecast"
+    if osm is not None:
+        osm.overpass_url = f"{upstream}/overpass/interpreter"
+    if cwc is not None:
+        cwc.site_url = upstream
+        cwc.report_url_template = upstream + "/cwc/en/daily-flood-bulletin-report-dated-{date}"
+    if imd is not None:
+        imd.base_url = upstream
+        imd.bulletin_url = f"{upstream}/imd/bulletin.php"
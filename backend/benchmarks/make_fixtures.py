@@ -0,0 +1,153 @@
+"""
+Generates the synthetic upstream payloads in fixtures/. None of them are recorded
+from the real services: they copy the field layout of each API (GDACS event list,
+Open-Meteo forecast, Overpass JSON, the IMD and CWC pages and a CWC-style station
+table PDF) with made-up content, so benchmark numbers measure our code on payloads
+of this shape and size, not on real bulletins. Seeded, and the PDFs are built in
+reportlab's invariant mode, so reruns are byte-identical.
+
+Needs reportlab for the two PDFs. Run from backend/:
+    python benchmarks/make_fixtures.py
+"""
+import os
+import json
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# (event type, lat, lon, country): Indian events, neighbours inside the India bounding box, and far away ones
+GDACS_PLACES = [
+    ("EQ", 27.7, 85.3, "Nepal"), ("EQ", 30.7, 79.1, "India"), ("FL", 26.1, 91.7, "India"), ("TC", 19.8, 86.0, "India"),
+    ("FL", 23.7, 90.4, "Bangladesh"), ("EQ", 35.7, 139.7, "Japan"), ("DR", 21.1, 79.1, "India"), ("FL", 9.9, 76.3, "India"),
+    ("EQ", 36.2, 71.1, "Afghanistan"), ("TC", 14.5, 121.0, "Philippines"),
+]
+
+# (station, river, district, state, warning level, danger level, HFL) in metres above sea level
+CWC_STATIONS = [
+    ("Dhubri", "Brahmaputra", "Dhubri", "Assam", 27.62, 28.62, 30.36),
+    ("Neamatighat", "Brahmaputra", "Jorhat", "Assam", 84.04, 85.04, 87.37),
+    ("Patna Gandhighat", "Ganga", "Patna", "Bihar", 47.60, 48.60, 50.52),
+    ("Haridwar", "Ganga", "Haridwar", "Uttarakhand", 293.00, 294.00, 296.30),
+    ("Kottayam", "Meenachil", "Kottayam", "Kerala", 2.50, 3.50, 4.20),
+    ("Jenapur", "Brahmani", "Jajpur", "Odisha", 22.00, 23.00, 24.78),
+    ("Bharuch", "Narmada", "Bharuch", "Gujarat", 6.71, 7.31, 10.28),
+    ("Delhi Rly Bridge", "Yamuna", "Delhi", "Delhi", 204.50, 205.33, 208.66),
+]
+
+def _write_json(name, data):
+    with open(os.path.join(FIXTURES_DIR, name), "w") as f:
+        json.dump(data, f, indent=1)
+
+def _write_text(name, text):
+    with open(os.path.join(FIXTURES_DIR, name), "w") as f:
+        f.write(text)
+
+def gdacs_events(rng, count=120):
+    features = []
+    for i in range(count):
+        kind, lat, lon, country = GDACS_PLACES[i % len(GDACS_PLACES)]
+        lat += rng.uniform(-1.5, 1.5)
+        lon += rng.uniform(-1.5, 1.5)
+        day = f"2026-10-{1 + i % 15:02d}"
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [round(lon, 3), round(lat, 3)]},
+            "properties": {
+                "eventtype": kind, "eventid": 1000000 + i, "episodeid": 2000000 + i,
+                "name": f"{kind} event {i} in {country}", "description": f"{kind} in {country}",
+                "alertlevel": rng.choice(["Green", "Orange", "Red"]), "country": country,
+                "fromdate": f"{day}T06:00:00", "todate": f"{day}T18:00:00", "datemodified": f"{day}T19:00:00",
+                "severitydata": ({"severity": round(rng.uniform(4, 7), 1), "severitytext": "Magnitude", "severityunit": "M"}
+                                 if kind == "EQ" else {"severity": 0}),
+            },
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+def open_meteo_point():
+    return {
+        "latitude": 28.625, "longitude": 77.25, "generationtime_ms": 0.12, "utc_offset_seconds": 0,
+        "timezone": "GMT", "elevation": 220.0,
+        "current_units": {"time": "iso8601", "interval": "seconds", "temperature_2m": "°C", "relative_humidity_2m": "%",
+                          "precipitation": "mm", "rain": "mm", "wind_speed_10m": "km/h", "wind_direction_10m": "°",
+                          "soil_moisture_0_to_1cm": "m³/m³"},
+        "current": {"time": "2026-10-17T06:00", "interval": 900, "temperature_2m": 29.4, "relative_humidity_2m": 71,
+                    "precipitation": 0.4, "rain": 0.4, "wind_speed_10m": 12.6, "wind_direction_10m": 240,
+                    "soil_moisture_0_to_1cm": 0.312},
+        "hourly_units": {"time": "iso8601", "visibility": "m"},
+        "hourly": {"time": [f"2026-10-17T{h:02d}:00" for h in range(24)], "visibility": [24140.0 - 200 * h for h in range(24)]},
+        "daily_units": {"time": "iso8601", "precipitation_sum": "mm"},
+        "daily": {"time": ["2026-10-17"], "precipitation_sum": [12.8]},
+    }
+
+def overpass(rng, count=300):
+    elements = []
+    for i in range(count):
+        amenity = ["hospital", "police", "fire_station"][i % 3]
+        elements.append({
+            "type": "node", "id": 5000000 + i,
+            "lat": round(28.61 + rng.uniform(-0.05, 0.05), 6), "lon": round(77.20 + rng.uniform(-0.05, 0.05), 6),
+            "tags": {"amenity": amenity, "name": f"{amenity.replace('_', ' ').title()} {i}"},
+        })
+    return {"version": 0.6, "generator": "Overpass API", "elements": elements}
+
+IMD_PAGE = """<html><body>
+<h2>All India Weather Forecast Bulletin</h2>
+<a id="default-block-btn" href="/imd/all_india_forcast_bulletin.pdf">All India Weather Forecast Bulletin</a>
+</body></html>
+"""
+
+CWC_PAGE = """<html><body>
+<h1>Daily Flood Bulletin</h1>
+<a href="/cwc/files/cfcrcwcdfb.pdf">Download Daily Flood Bulletin (PDF)</a>
+</body></html>
+"""
+
+def cwc_rows(rng, count=64):
+    """Station table laid out like the CWC daily flood bulletin, two-line headers included."""
+    rows = [["Sl.\nNo.", "Name of\nStation", "River", "District", "State", "Warning\nLevel (m)", "Danger\nLevel (m)",
+             "HFL (m)", "Present Level\nat 0800 hrs (m)", "Trend"]]
+    for i in range(count):
+        name, river, district, state, warning, danger, hfl = CWC_STATIONS[i % len(CWC_STATIONS)]
+        rows.append([str(i + 1), f"{name} {i // len(CWC_STATIONS) + 1}", river, district, state.upper(),
+                     f"{warning:.2f}", f"{danger:.2f}", f"{hfl:.2f}",
+                     f"{warning + rng.uniform(-1.5, 1.8):.2f}", rng.choice(["Rising", "Falling", "Steady"])])
+    return rows
+
+def write_pdfs(rows):
+    from reportlab import rl_config
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+    # Fixed creation date and document ID
+    rl_config.invariant = 1
+    styles = getSampleStyleSheet()
+    doc = SimpleDocTemplate(os.path.join(FIXTURES_DIR, "cwc_bulletin.pdf"), pagesize=landscape(A4),
+                            title="Daily Flood Situation Report")
+    table = Table(rows, repeatRows=0)
+    table.setStyle(TableStyle([("GRID", (0, 0), (-1, -1), 0.5, colors.black), ("FONTSIZE", (0, 0), (-1, -1), 8)]))
+    doc.build([Paragraph("Central Water Commission - Daily Flood Situation Report", styles["Title"]), Spacer(1, 8), table])
+
+    doc = SimpleDocTemplate(os.path.join(FIXTURES_DIR, "imd_bulletin.pdf"), pagesize=A4,
+                            title="All India Weather Forecast Bulletin")
+    story = [Paragraph("All India Weather Forecast Bulletin", styles["Title"])]
+    for i in range(40):
+        story.append(Paragraph(f"Subdivision {i + 1}: Light to moderate rainfall at many places with isolated heavy falls; "
+                               f"thunderstorm with lightning likely.", styles["Normal"]))
+    doc.build(story)
+
+def main():
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    # One generator in a fixed call order, so the output only changes when this script does
+    rng = random.Random(7)
+    _write_json("gdacs_events.json", gdacs_events(rng))
+    _write_json("open_meteo_point.json", open_meteo_point())
+    _write_json("overpass.json", overpass(rng))
+    _write_text("imd_bulletin.html", IMD_PAGE)
+    _write_text("cwc_report.html", CWC_PAGE)
+    write_pdfs(cwc_rows(rng))
+    print(f"Fixtures written to {FIXTURES_DIR}")
+
+if __name__ == "__main__":
+    main()
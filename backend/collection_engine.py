@@ -0,0 +1,85 @@
+import time
+import logging
+from metrics import COLLECTOR_SECONDS, COLLECTOR_TIMEOUTS
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger(__name__)
+
+class CollectionEngine:
+    """
+    Fans collector calls out over a bounded thread pool.
+    Each job is a zero-argument callable; the run as a whole is bounded by a deadline
+    so one stalled upstream cannot hold up the rest of the sync.
+    """
+    def __init__(self, max_workers=16, deadline=60, source_timeouts=None):
+        self.max_workers = max_workers
+        self.deadline = deadline
+        # Optional per-collector limits ({"gdacs": 30}), applied within the overall deadline
+        self.source_timeouts = source_timeouts or {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="collector")
+
+    @staticmethod
+    def _collector(name):
+        # Chunked jobs such as "weather:0" report under their collector name
+        return name.split(":")[0]
+
+    def _timed(self, name, fn):
+        start = time.monotonic()
+        outcome = "error"
+        try:
+            result = fn()
+            outcome = "ok"
+        finally:
+            elapsed = time.monotonic() - start
+            COLLECTOR_SECONDS.labels(self._collector(name), outcome).observe(elapsed)
+        logger.info(f"Collector '{name}' finished in {elapsed:.2f}s")
+        return result
+
+    def run(self, jobs, deadline=None):
+        """
+        Runs all jobs concurrently and waits at most `deadline` seconds overall, and at
+        most its collector's entry in source_timeouts for each job.
+        Returns (results, failures): every job ends up in exactly one of them. results
+        maps job name -> return value for jobs that completed in time, failures maps
+        job name -> reason for the rest.
+        """
+        deadline = deadline or self.deadline
+        start = time.monotonic()
+        futures = {self.executor.submit(self._timed, name, fn): name for name, fn in jobs.items()}
+        expires = {
+            future: start + min(deadline, self.source_timeouts.get(self._collector(name), deadline))
+            for future, name in futures.items()
+        }
+
+        results = {}
+        failures = {}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=max(0, min(expires[f] for f in pending) - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    logger.error(f"Collector '{name}' failed: {e}")
+                    failures[name] = str(e)
+            now = time.monotonic()
+            for future in [f for f in pending if expires[f] <= now]:
+                pending.discard(future)
+                if future.done():
+                    # Finished right at its limit; still a result, not a timeout
+                    pending.add(future)
+                    continue
+                # Running threads cannot be killed; their result is simply dropped.
+                future.cancel()
+                name = futures[future]
+                failures[name] = "timeout"
+                COLLECTOR_TIMEOUTS.labels(self._collector(name)).inc()
+                logger.warning(f"Collector '{name}' timed out after {now - start:.1f}s, skipped")
+
+        logger.info(f"Collection run: {len(results)}/{len(jobs)} sources in {time.monotonic() - start:.2f}s")
+        return results, failures
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ArtifactCache:
+    """
+    Persistent index of downloaded bulletins, keyed by the SHA-256 of the PDF bytes.
+    Remembers the ETag / Last-Modified validators per URL and the page images rendered
+    for each content hash, so unchanged bulletins are neither re-downloaded nor re-rendered.
+    """
+    def __init__(self, index_path="data/artifact_index.json", retention_days=7, keep_per_source=5):
+        self.index_path = index_path
+        self.retention_days = retention_days
+        self.keep_per_source = keep_per_source
+        self._lock = threading.Lock()
+        self._index = {"urls": {}, "artifacts": {}}
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, "r") as f:
+                    self._index = json.load(f)
+            except Exception as e:
+                logger.error(f"Artifact index unreadable, starting fresh: {e}")
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def validators(self, url):
+        """Conditional request headers for a URL whose artifact is still cached."""
+        with self._lock:
+            entry = self._index["urls"].get(url)
+            if not entry or entry.get("sha256") not in self._index["artifacts"]:
+                return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def sha_for_url(self, url):
+        with self._lock:
+            return self._index["urls"].get(url, {}).get("sha256")
+
+    def remember_url(self, url, sha256, etag=None, last_modified=None):
+        with self._lock:
+            self._index["urls"][url] = {"sha256": sha256, "etag": etag, "last_modified": last_modified}
+            self._save()
+
+    def get(self, sha256):
+        """Returns the artifact entry for a content hash and marks it as used, or None."""
+        with self._lock:
+            artifact = self._index["artifacts"].get(sha256)
+            if artifact:
+                artifact["last_used"] = time.time()
+                self._save()
+            return artifact
+
+    def put(self, sha256, source, **fields):
+        """Creates or updates the artifact entry for a content hash (e.g. pages=[...])."""
+        with self._lock:
+            artifact = self._index["artifacts"].setdefault(sha256, {"source": source, "created": time.time()})
+            artifact.update(fields)
+            artifact["last_used"] = time.time()
+            self._save()
+            return artifact
+
+    def gc(self, storage_dir):
+        """
+        Drops artifacts unused for retention_days, or beyond the newest keep_per_source
+        per source, and deletes their page images from storage_dir.
+        """
+        cutoff = time.time() - self.retention_days * 86400
+        removed = 0
+        with self._lock:
+            by_source = {}
+            for sha, artifact in self._index["artifacts"].items():
+                by_source.setdefault(artifact.get("source"), []).append((artifact.get("last_used", 0), sha))
+
+            expired = set()
+            for entries in by_source.values():
+                entries.sort(reverse=True)
+                for rank, (last_used, sha) in enumerate(entries):
+                    if rank >= self.keep_per_source or last_used < cutoff:
+                        expired.add(sha)
+
+            for sha in expired:
+                artifact = self._index["artifacts"].pop(sha)
+                for page_url in artifact.get("pages", []):
+                    path = os.path.join(storage_dir, os.path.basename(page_url))
+                    if os.path.exists(path):
+                        os.remove(path)
+                        removed += 1
+            self._index["urls"] = {u: e for u, e in self._index["urls"].items() if e.get("sha256") not in expired}
+            if expired:
+                self._save()
+        if removed:
+            logger.info(f"Artifact GC: removed {removed} page images from {len(expired)} bulletins")
+        return removed
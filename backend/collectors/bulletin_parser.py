@@ -0,0 +1,169 @@
+import re
+import shutil
+import logging
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+TRENDS = {"rising": "rising", "rise": "rising", "falling": "falling", "fall": "falling",
+          "steady": "steady", "stationary": "steady"}
+
+# Header keywords per record field, most specific first ("warning level" also contains "level")
+HEADER_KEYWORDS = [
+    ("warning_level", ("warning",)),
+    ("danger_level", ("danger",)),
+    ("hfl", ("hfl", "highest flood")),
+    ("trend", ("trend", "tendency")),
+    ("station", ("station", "site")),
+    ("river", ("river",)),
+    ("district", ("district",)),
+    ("state", ("state",)),
+    ("current_level", ("present", "current", "actual", "observed", "level at", "water level")),
+]
+
+_NUMBER = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*(?:m\b|$)", re.IGNORECASE)
+
+def _level(cell):
+    match = _NUMBER.match(str(cell or "").replace(",", ""))
+    return float(match.group(1)) if match else None
+
+def _trend(cell):
+    word = str(cell or "").strip().lower()
+    return next((value for key, value in TRENDS.items() if word.startswith(key)), None)
+
+def _clean(cell):
+    text = " ".join(str(cell or "").split())
+    return text or None
+
+def _record(station, river, current, warning, danger, trend, state=None, district=None):
+    if not station or current is None:
+        return None
+    if danger is not None and current >= danger:
+        status = "above_danger"
+    elif warning is not None and current >= warning:
+        status = "above_warning"
+    else:
+        status = "normal"
+    return {
+        "station": station,
+        "river": river,
+        "state": state.title() if state else None,
+        "district": district,
+        "current_level": current,
+        "warning_level": warning,
+        "danger_level": danger,
+        "trend": trend,
+        "status": status,
+    }
+
+# --- pdfplumber tables ---
+
+def _header_map(cells):
+    """Maps record fields to column positions from a header row, or None if it is not one."""
+    columns = {}
+    for col, cell in enumerate(cells):
+        text = (_clean(cell) or "").lower()
+        for field, keywords in HEADER_KEYWORDS:
+            if field not in columns and any(k in text for k in keywords):
+                columns[field] = col
+                break
+    if "station" in columns and "current_level" in columns:
+        return columns
+    return None
+
+def _table_records(table, columns):
+    """Returns (records, columns) for one extracted table, detecting a (multi-row) header."""
+    start = 0
+    for depth in (1, 2, 3):
+        if len(table) < depth:
+            break
+        # Header text can be split over several rows; join it column by column
+        merged = [" ".join(_clean(row[c]) or "" for row in table[:depth] if c < len(row))
+                  for c in range(max(len(row) for row in table[:depth]))]
+        found = _header_map(merged)
+        if found:
+            columns, start = found, depth
+            break
+    if columns is None:
+        return [], None
+
+    records = []
+    for row in table[start:]:
+        cell = lambda field: row[columns[field]] if field in columns and columns[field] < len(row) else None
+        record = _record(_clean(cell("station")), _clean(cell("river")), _level(cell("current_level")),
+                         _level(cell("warning_level")), _level(cell("danger_level")), _trend(cell("trend")),
+                         _clean(cell("state")), _clean(cell("district")))
+        if record:
+            records.append(record)
+    return records, columns
+
+def _parse_with_pdfplumber(pdf_path):
+    import pdfplumber
+    records = []
+    columns = None  # tables continuing onto the next page repeat no header
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            for table in page.extract_tables():
+                found, columns = _table_records(table, columns)
+                records.extend(found)
+    return records
+
+# --- pdftotext -layout ---
+
+def _text_order(lines):
+    """Order of the text columns, from where their header words sit on the header lines."""
+    for i, line in enumerate(lines):
+        low = line.lower()
+        if "station" in low and "river" in low:
+            offsets = {}
+            for header in lines[max(0, i - 1):i + 2]:
+                for field in ("station", "river", "district", "state"):
+                    pos = header.lower().find(field)
+                    if pos >= 0:
+                        offsets[field] = min(pos, offsets.get(field, pos))
+            return sorted(offsets, key=offsets.get)
+    return ["station", "river"]
+
+def _parse_with_pdftotext(pdf_path):
+    text = subprocess.run(["pdftotext", "-layout", pdf_path, "-"], capture_output=True,
+                          text=True, timeout=60, check=True).stdout
+    lines = text.splitlines()
+    order = _text_order(lines)
+    records = []
+    for line in lines:
+        cells = [c for c in re.split(r"\s{2,}", line.strip()) if c]
+        trend_at = next((i for i, c in enumerate(cells) if _trend(c)), None)
+        if trend_at is None:
+            continue
+        texts, numbers = [], []
+        for cell in cells[:trend_at]:
+            value = _level(cell)
+            if value is None:
+                texts.append(cell)
+            elif texts:  # numbers before the first text column are serial numbers
+                numbers.append(value)
+        if len(numbers) < 2:
+            continue
+        fields = dict(zip(order, texts))
+        # Level columns run warning, danger, [HFL,] present level
+        record = _record(fields.get("station"), fields.get("river"), numbers[-1], numbers[0],
+                         numbers[1] if len(numbers) > 2 else None, _trend(cells[trend_at]),
+                         fields.get("state"), fields.get("district"))
+        if record:
+            records.append(record)
+    return records
+
+def parse_cwc_bulletin(pdf_path):
+    """
+    Extracts station rows (station, river, state, current/warning/danger level, trend)
+    from a CWC daily flood bulletin. Uses pdfplumber's table finder when installed and
+    poppler's `pdftotext -layout` otherwise. Returns a list of record dicts.
+    """
+    try:
+        records = _parse_with_pdfplumber(pdf_path)
+        if records or shutil.which("pdftotext") is None:
+            return records
+    except ImportError:
+        if shutil.which("pdftotext") is None:
+            raise RuntimeError("CWC bulletin parsing needs pdfplumber or poppler's pdftotext")
+    return _parse_with_pdftotext(pdf_path)
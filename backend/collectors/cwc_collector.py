@@ -1,17 +1,23 @@
-import requests
+from .http_client import http
 from bs4 import BeautifulSoup
 from .pdf_manager import pdf_manager
+from .bulletin_parser import parse_cwc_bulletin
 import logging
 
 logger = logging.getLogger(__name__)
 
 class CWCCollector:
-    def __init__(self):
+    def __init__(self, render_images=False):
         self.base_url = "http://cewacor.nic.in"
         # CWC Bulletins page (example ID, might need updating)
         self.bulletin_url = "http://cewacor.nic.in/index2.php?lang=1&sublinkid=1130&linkid=1174&lid=754" 
         # Better robust link for Flood Forecast
         self.flood_url = "https://ffms.mowr.gov.in/" 
+        self.site_url = "https://cwc.gov.in"
+        self.report_url_template = self.site_url + "/en/daily-flood-bulletin-report-dated-{date}"
+        # Station tables are parsed from the PDF; page images are only rendered on request
+        # or when no table could be extracted
+        self.render_images = render_images
 
     def fetch_data(self):
         """Scrapes CWC website for the latest flood situation report using dynamic date."""
@@ -31,11 +37,11 @@ class CWCCollector:
             
             for date_obj in dates_to_try:
                 date_str = date_obj.strftime("%d%m%Y")
-                report_page_url = f"https://cwc.gov.in/en/daily-flood-bulletin-report-dated-{date_str}"
+                report_page_url = self.report_url_template.format(date=date_str)
                 
                 logger.info(f"Checking CWC Report Page: {report_page_url}")
                 try:
-                    res = requests.get(report_page_url, verify=False, timeout=10)
+                    res = http.get(report_page_url, verify=False, timeout=10)
                     if res.status_code == 200:
                         soup = BeautifulSoup(res.content, 'html.parser')
                         # Find PDF link in this page
@@ -56,17 +62,19 @@ class CWCCollector:
                 pdf_link, date_str = found_data
                 if not pdf_link.startswith('http'):
                      # CWC relative links can be messy, usually relative to domain root
-                     pdf_link = "https://cwc.gov.in" + pdf_link if pdf_link.startswith('/') else "https://cwc.gov.in/" + pdf_link
+                     pdf_link = self.site_url + pdf_link if pdf_link.startswith('/') else self.site_url + "/" + pdf_link
 
                 logger.info(f"Found Verified CWC PDF: {pdf_link}")
-                pdf_path = pdf_manager.download_pdf(pdf_link, f"cwc_flood_{date_str}")
-                
-                if pdf_path:
-                    images = pdf_manager.convert_to_images(pdf_path, "cwc_flood")
+                # Skips download and parsing when the bulletin is unchanged
+                bulletin = pdf_manager.fetch_bulletin(pdf_link, "cwc_flood", parser=parse_cwc_bulletin,
+                                                      render_images=self.render_images)
+
+                if bulletin is not None:
                     return {
                         "source": "CWC",
                         "type": "flood_report",
-                        "images": images,
+                        "stations": bulletin["records"] or [],
+                        "images": bulletin["pages"],
                         "original_pdf": pdf_link,
                         "date": date_str
                     }
@@ -1,69 +1,202 @@
-import requests
+import os
+import json
+import hashlib
 import logging
-from datetime import datetime
+import threading
+from .http_client import http
+from datetime import datetime, timedelta, timezone
+
+# Optional incremental JSON parser; without it the whole response is parsed at once
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 class GDACSCollector:
-    def __init__(self):
+    def __init__(self, index_path="data/gdacs_index.json", lookback_days=30, regions=None):
         self.feed_url = "https://www.gdacs.org/xml/rss.xml"
+        self.api_url = "https://www.gdacs.org/gdacsapi/api/events/geteventlist/SEARCH"
         # Rough Bounding Box for India
         self.india_lat_min = 6.0
         self.india_lat_max = 37.0
         self.india_lon_min = 68.0
         self.india_lon_max = 98.0
+        self.timeout = 20
+        # Only ask GDACS for events from the last lookback_days (the API has no bbox filter)
+        self.lookback_days = lookback_days
+        # Optional RegionIndex for exact state/district filtering inside the bounding box
+        self.regions = regions
+        # Persistent per-episode index: fingerprint, processed event (None when outside India) and end date
+        self.index_path = index_path
+        self._index = self._load_index()
+        filter_signature = regions.signature if regions is not None else "bbox"
+        if self._index.get("filter") != filter_signature:
+            # Events were classified with different boundaries; reprocess everything
+            self._index = {"etag": None, "last_modified": None, "episodes": {}, "filter": filter_signature}
+        self.last_changes = {"new": [], "updated": [], "resolved": []}
+        # fetch_data mutates and saves the shared index; concurrent calls run one at a time
+        self._fetch_lock = threading.Lock()
+
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r") as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"GDACS: Index unreadable, starting fresh - {e}")
+        return {"etag": None, "last_modified": None, "episodes": {}, "filter": None}
+
+    def _save_index(self):
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _params(self):
+        return {
+            "eventlist": "EQ,TC,FL,DR",
+            "alertlevel": "Green,Orange,Red",
+            "fromDate": (datetime.now(timezone.utc) - timedelta(days=self.lookback_days)).strftime("%Y-%m-%d"),
+            "toDate": (datetime.now(timezone.utc) + timedelta(days=1)).strftime("%Y-%m-%d"),
+        }
+
+    def _iter_features(self, response):
+        if ijson is not None:
+            response.raw.decode_content = True
+            yield from ijson.items(response.raw, "features.item", use_float=True)
+        else:
+            yield from response.json().get("features", [])
+
+    @staticmethod
+    def _fingerprint(props):
+        modified = props.get("datemodified")
+        if modified:
+            return f"{modified}|{props.get('alertlevel')}"
+        return hashlib.sha1(json.dumps(props, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _to_event(self, feature):
+        """Returns the alert dict for a feature inside the India region, else None."""
+        props = feature.get('properties', {})
+        geometry = feature.get('geometry', {})
+        if not geometry:
+            return None
+
+        coords = geometry.get('coordinates', [0, 0])
+        lon, lat = coords[0], coords[1]
+
+        # Filter for India Region
+        if not (self.india_lat_min <= lat <= self.india_lat_max and
+                self.india_lon_min <= lon <= self.india_lon_max):
+            return None
+
+        # Exact check against state boundaries; the rectangle also covers neighbouring countries
+        state, district = None, None
+        if self.regions is not None and self.regions.loaded:
+            state, district = self.regions.locate(lat, lon)
+            if state is None:
+                return None
+
+        return {
+            "type": "disaster",
+            "source": "GDACS",
+            "event_type": props.get('eventtype'),
+            "name": props.get('name'),
+            "description": props.get('description'),
+            "severity": props.get('alertlevel'),
+            "lat": lat,
+            "lon": lon,
+            "time": props.get('fromdate'), # or todate
+            "metadata": {
+                "country": props.get('country'),
+                "episode_id": props.get('episodeid'),
+                "state": state,
+                "district": district,
+                # GDACS puts the magnitude of earthquakes in severitydata
+                "magnitude": (props.get('severitydata') or {}).get('severity') if props.get('eventtype') == 'EQ' else None
+            }
+        }
+
+    @staticmethod
+    def _still_active(todate):
+        """Whether an episode's end date (GDACS todate, UTC) has not passed yet."""
+        try:
+            end = datetime.fromisoformat(str(todate).replace("Z", "+00:00"))
+        except ValueError:
+            return False
+        if end.tzinfo is None:
+            end = end.replace(tzinfo=timezone.utc)
+        return end > datetime.now(timezone.utc)
+
+    def current_events(self):
+        return [e["event"] for e in self._index["episodes"].values() if e["event"]]
 
     def fetch_data(self):
-        """Fetches live disaster alerts from GDACS and filters for India."""
+        """
+        Fetches live disaster alerts from GDACS and filters for India.
+        Only features that are new or changed since the last run are processed; the
+        full current India list is returned and the delta is kept in `last_changes`.
+        Returns None when the feed could not be fetched, so callers keep their last good list.
+        """
+        with self._fetch_lock:
+            return self._fetch_data()
+
+    def _fetch_data(self):
+        self.last_changes = {"new": [], "updated": [], "resolved": []}
         try:
-            # Note: GDACS RSS is the most stable public feed.
-            # Ideally we would use the GeoJSON API but it's often rate-limited or requires specific event IDs.
-            # For this MVP, we parse the RSS feed or use their public JSON endpoint if available.
-            # Let's try the JSON endpoint first which is cleaner.
-            
-            response = requests.get("https://www.gdacs.org/gdacsapi/api/events/geteventlist/SEARCH?eventlist=EQ,TC,FL,DR&alertlevel=Green,Orange,Red")
-            
-            if response.status_code == 200:
-                data = response.json()
-                features = data.get('features', [])
-                
-                india_events = []
-                for feature in features:
+            headers = {}
+            if self._index.get("etag"):
+                headers["If-None-Match"] = self._index["etag"]
+            if self._index.get("last_modified"):
+                headers["If-Modified-Since"] = self._index["last_modified"]
+
+            with http.get(self.api_url, params=self._params(), headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304:
+                    print("GDACS: Feed unchanged.")
+                    return self.current_events()
+                if response.status_code != 200:
+                    print(f"GDACS: Error fetching data {response.status_code}")
+                    return None
+
+                episodes = self._index["episodes"]
+                seen = set()
+                for feature in self._iter_features(response):
                     props = feature.get('properties', {})
-                    geometry = feature.get('geometry', {})
-                    if not geometry:
+                    episode = props.get('episodeid') or props.get('eventid')
+                    if episode is None:
+                        continue
+                    key = str(episode)
+                    seen.add(key)
+                    fingerprint = self._fingerprint(props)
+                    known = episodes.get(key)
+                    if known and known["fingerprint"] == fingerprint:
                         continue
-                        
-                    coords = geometry.get('coordinates', [0, 0])
-                    lon, lat = coords[0], coords[1]
-
-                    # Filter for India Region
-                    if (self.india_lat_min <= lat <= self.india_lat_max and 
-                        self.india_lon_min <= lon <= self.india_lon_max):
-                        
-                        india_events.append({
-                            "type": "disaster",
-                            "source": "GDACS",
-                            "event_type": props.get('eventtype'),
-                            "name": props.get('name'),
-                            "description": props.get('description'),
-                            "severity": props.get('alertlevel'),
-                            "lat": lat,
-                            "lon": lon,
-                            "time": props.get('fromdate'), # or todate
-                            "metadata": {
-                                "country": props.get('country'),
-                                "episode_id": props.get('episodeid')
-                            }
-                        })
-                
-                print(f"GDACS: Found {len(india_events)} events in India region.")
-                return india_events
-            else:
-                print(f"GDACS: Error fetching data {response.status_code}")
-                return []
-                
+
+                    event = self._to_event(feature)
+                    episodes[key] = {"fingerprint": fingerprint, "event": event, "todate": props.get('todate')}
+                    if event:
+                        self.last_changes["updated" if known and known["event"] else "new"].append(event)
+
+                # Long-running events (droughts, multi-week floods) drop out of the fromDate
+                # window while still active; only episodes whose end date has passed are resolved
+                for key in [k for k in episodes if k not in seen and not self._still_active(episodes[k].get("todate"))]:
+                    gone = episodes.pop(key)
+                    if gone["event"]:
+                        self.last_changes["resolved"].append(key)
+
+                self._index["etag"] = response.headers.get("ETag")
+                self._index["last_modified"] = response.headers.get("Last-Modified")
+            self._save_index()
+
+            india_events = self.current_events()
+            print(f"GDACS: Found {len(india_events)} events in India region "
+                  f"({len(self.last_changes['new'])} new, {len(self.last_changes['updated'])} updated, "
+                  f"{len(self.last_changes['resolved'])} resolved).")
+            return india_events
+
         except Exception as e:
             print(f"GDACS: Exception occurred - {e}")
-            return []
+            return None
 
 if __name__ == "__main__":
     collector = GDACSCollector()
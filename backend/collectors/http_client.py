@@ -0,0 +1,183 @@
+import os
+import time
+import random
+import threading
+import logging
+import requests
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from metrics import UPSTREAM_SECONDS, CIRCUIT_OPEN
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(requests.RequestException):
+    """Raised without touching the network while an upstream's circuit is open."""
+
+class _CircuitBreaker:
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        # Start time of the single half-open probe in flight, if any
+        self.probe_started = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at < self.cooldown:
+                return False
+            # Half-open: one probe at a time. A probe that never reported back
+            # (e.g. its caller raised) stops blocking others after another cooldown.
+            if self.probe_started is not None and now - self.probe_started < self.cooldown:
+                return False
+            self.probe_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probe_started = None
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+class HttpClient:
+    """
+    Shared HTTP layer for all collectors: one keep-alive connection pool, a cap on
+    concurrent requests per host, retries with exponential backoff and jitter, and a
+    circuit breaker per upstream host. Non-streaming requests can optionally go over
+    HTTP/2 when httpx (with h2) is installed.
+    """
+    def __init__(self, timeout=15, retries=2, backoff=0.5, max_backoff=8, max_per_host=4,
+                 breaker_threshold=5, breaker_cooldown=60, http2=False):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_per_host = max_per_host
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=max_per_host, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._hosts_lock = threading.Lock()
+        self._host_slots = {}
+        self._breakers = {}
+        self._h2_clients = {}
+        self.http2 = False
+        if http2:
+            try:
+                import h2  # noqa: F401 - httpx needs it for http2=True
+                import httpx
+                self._httpx = httpx
+                self.http2 = True
+            except ImportError:
+                logger.warning("httpx[http2] not installed, using HTTP/1.1")
+
+    def _host_state(self, host):
+        with self._hosts_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+                self._breakers[host] = _CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+            return self._host_slots[host], self._breakers[host]
+
+    def _h2_client(self, verify):
+        with self._hosts_lock:
+            if verify not in self._h2_clients:
+                self._h2_clients[verify] = self._httpx.Client(
+                    # requests follows redirects by default; httpx only when asked
+                    http2=True, verify=verify, follow_redirects=True,
+                    limits=self._httpx.Limits(max_keepalive_connections=32, max_connections=64)
+                )
+            return self._h2_clients[verify]
+
+    def _send(self, method, url, stream, **kwargs):
+        if self.http2 and not stream:
+            client = self._h2_client(kwargs.pop("verify", True))
+            return client.request(method, url, **kwargs)
+        return self.session.request(method, url, stream=stream, **kwargs)
+
+    def _sleep(self, attempt, response=None):
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = min(self.max_backoff, float(retry_after))
+        # Full jitter so concurrent collectors do not retry in lockstep
+        time.sleep(random.uniform(0, delay))
+
+    def request(self, method, url, retries=None, stream=False, **kwargs):
+        """
+        Sends a request with pooling, retries and circuit breaking.
+        Returns the last response (callers still check status_code) or raises the last
+        connection error. Streamed bodies are read outside the per-host slot.
+        """
+        host = urlparse(url).netloc
+        slots, breaker = self._host_state(host)
+        if not breaker.allow():
+            CIRCUIT_OPEN.labels(host).inc()
+            raise CircuitOpenError(f"Circuit open for {host}")
+
+        kwargs.setdefault("timeout", self.timeout)
+        retries = self.retries if retries is None else retries
+        error = None
+        for attempt in range(retries + 1):
+            response = None
+            if not slots.acquire(timeout=kwargs["timeout"] if isinstance(kwargs["timeout"], (int, float)) else None):
+                error = requests.Timeout(f"No free connection slot for {host}")
+            else:
+                started = time.monotonic()
+                try:
+                    response = self._send(method, url, stream, **dict(kwargs))
+                    error = None
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                except Exception as e:
+                    # httpx transport errors
+                    if type(e).__module__.startswith("httpx"):
+                        error = requests.ConnectionError(str(e))
+                    else:
+                        raise
+                finally:
+                    slots.release()
+                    UPSTREAM_SECONDS.labels(host, str(response.status_code) if response is not None else "error").observe(time.monotonic() - started)
+
+            if response is not None and response.status_code not in RETRY_STATUS:
+                breaker.record_success()
+                return response
+            if attempt == retries:
+                break
+            if response is not None:
+                response.close()
+            logger.info(f"HTTP retry {attempt + 1}/{retries} for {host}: {error or response.status_code}")
+            self._sleep(attempt, response)
+
+        breaker.record_failure()
+        if response is not None:
+            return response
+        raise error
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+# NEXUS_HTTP2=1 sends non-streaming requests over HTTP/2 (needs httpx[http2])
+http = HttpClient(http2=os.environ.get("NEXUS_HTTP2") == "1")
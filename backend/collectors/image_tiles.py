@@ -0,0 +1,143 @@
+import os
+import json
+import math
+import time
+import shutil
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ImagePyramid:
+    """
+    Content-addressed tile pyramids and thumbnails for large images (satellite frames).
+    Every distinct image gets its own `root/<hash>/` directory holding manifest.json,
+    WebP thumbnails and tiles/<level>/<col>_<row>.webp, where level 0 fits in one tile
+    and the top level is the full resolution. Directories never change once written,
+    so they can be served with immutable cache headers.
+    """
+    def __init__(self, root="assets/images/satellite", url_prefix="/assets/images/satellite",
+                 tile_size=256, thumbnail_widths=(256, 768), quality=80, keep=8):
+        self.root = root
+        self.url_prefix = url_prefix
+        self.tile_size = tile_size
+        self.thumbnail_widths = thumbnail_widths
+        self.quality = quality
+        # Number of most recent image sets kept on disk
+        self.keep = keep
+
+    @staticmethod
+    def file_hash(path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _manifest_path(self, key):
+        return os.path.join(self.root, key, "manifest.json")
+
+    def publish(self, image_path, sha256=None):
+        """
+        Builds the tile set for an image unless one already exists for its content hash.
+        Returns the manifest dict, or None when Pillow is unavailable or the build failed.
+        """
+        key = (sha256 or self.file_hash(image_path))[:16]
+        manifest_path = self._manifest_path(key)
+        if os.path.exists(manifest_path):
+            # Mark as recently used so gc keeps it
+            os.utime(os.path.dirname(manifest_path))
+            with open(manifest_path, "r") as f:
+                return json.load(f)
+
+        try:
+            from PIL import Image
+        except ImportError:
+            logger.warning("Pillow not installed, skipping image tiles")
+            return None
+
+        os.makedirs(self.root, exist_ok=True)
+        build_dir = os.path.join(self.root, f".{key}.{os.getpid()}.tmp")
+        try:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            with Image.open(image_path) as source:
+                image = source.convert("RGB")
+            manifest = self._build(image, key, build_dir)
+            with open(os.path.join(build_dir, "manifest.json"), "w") as f:
+                json.dump(manifest, f)
+            # Publish the whole directory at once; a concurrent build of the same hash wins the race harmlessly
+            try:
+                os.rename(build_dir, os.path.join(self.root, key))
+            except OSError:
+                shutil.rmtree(build_dir, ignore_errors=True)
+            logger.info(f"Image pyramid {key}: {manifest['width']}x{manifest['height']}, {len(manifest['levels'])} levels")
+            self.gc()
+            return manifest
+        except Exception as e:
+            logger.error(f"Failed to build image pyramid for {image_path}: {e}")
+            shutil.rmtree(build_dir, ignore_errors=True)
+            return None
+
+    def _build(self, image, key, build_dir):
+        from PIL import Image
+        width, height = image.size
+        top = max(0, math.ceil(math.log2(max(width, height) / self.tile_size)))
+        base_url = f"{self.url_prefix}/{key}"
+        levels = []
+
+        level_image = image
+        for level in range(top, -1, -1):
+            if level != top:
+                size = (max(1, math.ceil(width / 2 ** (top - level))), max(1, math.ceil(height / 2 ** (top - level))))
+                # Each level is downsampled from the one above it, not from the full frame
+                level_image = level_image.resize(size, Image.LANCZOS)
+            w, h = level_image.size
+            cols, rows = math.ceil(w / self.tile_size), math.ceil(h / self.tile_size)
+            level_dir = os.path.join(build_dir, "tiles", str(level))
+            os.makedirs(level_dir, exist_ok=True)
+            for col in range(cols):
+                for row in range(rows):
+                    box = (col * self.tile_size, row * self.tile_size,
+                           min(w, (col + 1) * self.tile_size), min(h, (row + 1) * self.tile_size))
+                    level_image.crop(box).save(os.path.join(level_dir, f"{col}_{row}.webp"), "WEBP", quality=self.quality)
+            levels.append({"level": level, "width": w, "height": h, "cols": cols, "rows": rows})
+
+        thumbnails = {}
+        for thumb_width in self.thumbnail_widths:
+            if thumb_width >= width:
+                continue
+            thumb = image.resize((thumb_width, max(1, round(height * thumb_width / width))), Image.LANCZOS)
+            name = f"thumb_{thumb_width}.webp"
+            thumb.save(os.path.join(build_dir, name), "WEBP", quality=self.quality)
+            thumbnails[str(thumb_width)] = f"{base_url}/{name}"
+
+        return {
+            "hash": key,
+            "width": width,
+            "height": height,
+            "tile_size": self.tile_size,
+            "format": "webp",
+            "levels": sorted(levels, key=lambda l: l["level"]),
+            "tile_url": base_url + "/tiles/{level}/{col}_{row}.webp",
+            "thumbnails": thumbnails,
+            "manifest": f"{base_url}/manifest.json",
+        }
+
+    def gc(self):
+        """Keeps the newest `keep` image sets and deletes older ones and abandoned builds."""
+        if not os.path.isdir(self.root):
+            return 0
+        sets = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if not os.path.isdir(path):
+                continue
+            if name.startswith("."):
+                if os.path.getmtime(path) < time.time() - 3600:
+                    shutil.rmtree(path, ignore_errors=True)
+            else:
+                sets.append(path)
+        sets.sort(key=os.path.getmtime, reverse=True)
+        for path in sets[self.keep:]:
+            shutil.rmtree(path, ignore_errors=True)
+        return max(0, len(sets) - self.keep)
@@ -1,4 +1,4 @@
-import requests
+from .http_client import http
 from bs4 import BeautifulSoup
 import logging
 import os
@@ -24,7 +24,7 @@ class IMDCollector:
             logger.info("Fetching IMD data...")
             # Real-time scraping using verified selector
             try:
-                 response = requests.get(self.bulletin_url, verify=False, timeout=30)
+                 response = http.get(self.bulletin_url, verify=False, timeout=30)
                  soup = BeautifulSoup(response.content, 'html.parser')
             except Exception as e:
                  logger.error(f"IMD Request failed: {e}")
@@ -52,9 +52,9 @@ class IMDCollector:
                 
                  # Handle missing pdf_manager
                 if pdf_manager:
-                    pdf_path = pdf_manager.download_pdf(pdf_link, "imd_weather")
-                    if pdf_path:
-                        images = pdf_manager.convert_to_images(pdf_path, "imd_weather")
+                    # Skips download and rendering when the bulletin is unchanged
+                    images = pdf_manager.fetch_pages(pdf_link, "imd_weather")
+                    if images is not None:
                         return {
                             "source": "IMD",
                             "type": "weather_bulletin",
@@ -0,0 +1,297 @@
+import os
+import sys
+import json
+import math
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Name properties of the common India boundary sets: datameet (st_nm, dtname),
+# GADM (NAME_1, NAME_2) and geoBoundaries (shapeName)
+STATE_FIELDS = ("st_nm", "ST_NM", "NAME_1", "shapeName", "state", "State", "name")
+DISTRICT_FIELDS = ("district", "DISTRICT", "dtname", "NAME_2", "shapeName", "name")
+
+# geoBoundaries gbOpen metadata API (CC BY 4.0); level ADM1 = states, ADM2 = districts
+GEOBOUNDARIES_API = "https://www.geoboundaries.org/api/current/gbOpen/IND/{level}/"
+
+def _point_in_ring(lon, lat, ring):
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+class _Layer:
+    """
+    One boundary layer (states or districts) prepared for fast lookups.
+    Every grid cell a boundary edge passes through lists the polygons to test exactly;
+    cells with no edge in them are resolved once at load time to a single name.
+    """
+    def __init__(self, cell_deg):
+        self.cell_deg = cell_deg
+        self.polygons = []  # (name, bbox, [outer ring, hole rings...])
+        self.interior = {}  # cell -> polygon index
+        self.boundary = {}  # cell -> [polygon index]
+
+    def _cell(self, lon, lat):
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def add_feature(self, name, geometry):
+        if geometry.get("type") == "Polygon":
+            parts = [geometry["coordinates"]]
+        elif geometry.get("type") == "MultiPolygon":
+            parts = geometry["coordinates"]
+        else:
+            return
+        for rings in parts:
+            xs = [p[0] for p in rings[0]]
+            ys = [p[1] for p in rings[0]]
+            self.polygons.append((name, (min(xs), min(ys), max(xs), max(ys)), rings))
+
+    def _contains(self, idx, lon, lat):
+        _, (x0, y0, x1, y1), rings = self.polygons[idx]
+        if not (x0 <= lon <= x1 and y0 <= lat <= y1):
+            return False
+        if not _point_in_ring(lon, lat, rings[0]):
+            return False
+        return not any(_point_in_ring(lon, lat, hole) for hole in rings[1:])
+
+    def prepare(self):
+        for idx, (_, (x0, y0, x1, y1), rings) in enumerate(self.polygons):
+            edge_cells = set()
+            for ring in rings:
+                for (ax, ay), (bx, by) in zip(ring, ring[1:] + ring[:1]):
+                    r0, c0 = self._cell(min(ax, bx), min(ay, by))
+                    r1, c1 = self._cell(max(ax, bx), max(ay, by))
+                    for r in range(r0, r1 + 1):
+                        for c in range(c0, c1 + 1):
+                            edge_cells.add((r, c))
+            for cell in edge_cells:
+                self.boundary.setdefault(cell, []).append(idx)
+
+            r0, c0 = self._cell(x0, y0)
+            r1, c1 = self._cell(x1, y1)
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    if (r, c) in edge_cells:
+                        continue
+                    # No edge crosses this cell, so its centre decides the whole cell
+                    centre_lon, centre_lat = (c + 0.5) * self.cell_deg, (r + 0.5) * self.cell_deg
+                    if self._contains(idx, centre_lon, centre_lat):
+                        self.interior[(r, c)] = idx
+
+        # A cell can only be interior if no other polygon has an edge in it; otherwise the
+        # polygon that covers it becomes one more candidate for the exact test there
+        for cell, idx in list(self.interior.items()):
+            if cell in self.boundary:
+                del self.interior[cell]
+                self.boundary[cell].append(idx)
+
+        # Dense copy of the cell classification for vectorized lookups:
+        # polygon index for interior cells, -1 for empty cells, -2 for boundary cells
+        cells = list(self.interior) + list(self.boundary)
+        if not cells:
+            self.grid = None
+            return
+        self.row0 = min(r for r, _ in cells)
+        self.col0 = min(c for _, c in cells)
+        rows = max(r for r, _ in cells) - self.row0 + 1
+        cols = max(c for _, c in cells) - self.col0 + 1
+        self.grid = np.full((rows, cols), -1, dtype=np.int32)
+        for (r, c), idx in self.interior.items():
+            self.grid[r - self.row0, c - self.col0] = idx
+        for (r, c) in self.boundary:
+            self.grid[r - self.row0, c - self.col0] = -2
+
+    def lookup(self, lon, lat):
+        cell = self._cell(lon, lat)
+        idx = self.interior.get(cell)
+        if idx is not None:
+            return self.polygons[idx][0]
+        for idx in self.boundary.get(cell, ()):
+            if self._contains(idx, lon, lat):
+                return self.polygons[idx][0]
+        return None
+
+    def lookup_many(self, lons, lats):
+        """Vectorized lookup; only points in boundary cells fall back to exact tests."""
+        lons = np.asarray(lons, dtype=float)
+        lats = np.asarray(lats, dtype=float)
+        names = np.full(len(lons), None, dtype=object)
+        if self.grid is None or not len(lons):
+            return names
+        rows = np.floor(lats / self.cell_deg).astype(np.int64) - self.row0
+        cols = np.floor(lons / self.cell_deg).astype(np.int64) - self.col0
+        valid = (rows >= 0) & (rows < self.grid.shape[0]) & (cols >= 0) & (cols < self.grid.shape[1])
+        codes = np.full(len(lons), -1, dtype=np.int32)
+        codes[valid] = self.grid[rows[valid], cols[valid]]
+
+        poly_names = np.array([p[0] for p in self.polygons], dtype=object)
+        interior = codes >= 0
+        names[interior] = poly_names[codes[interior]]
+
+        # Group boundary points by candidate polygon and ray-cast each group in one go
+        by_polygon = {}
+        for i in np.flatnonzero(codes == -2):
+            cell = (int(rows[i] + self.row0), int(cols[i] + self.col0))
+            for idx in self.boundary.get(cell, ()):
+                by_polygon.setdefault(idx, []).append(i)
+        for idx, members in by_polygon.items():
+            members = np.asarray(members)
+            members = members[np.equal(names[members], None)] # not yet resolved
+            if len(members):
+                hit = self._contains_many(idx, lons[members], lats[members])
+                names[members[hit]] = self.polygons[idx][0]
+        return names
+
+    def _contains_many(self, idx, lons, lats):
+        _, (x0, y0, x1, y1), rings = self.polygons[idx]
+        inside = (lons >= x0) & (lons <= x1) & (lats >= y0) & (lats <= y1)
+        if not inside.any():
+            return inside
+        result = np.zeros(len(lons), dtype=bool)
+        candidates = np.flatnonzero(inside)
+        px, py = lons[candidates, None], lats[candidates, None]
+        for ring_no, ring in enumerate(rings):
+            xy = np.asarray(ring, dtype=float)[:, :2]
+            xi, yi = xy[:, 0], xy[:, 1]
+            xj, yj = np.roll(xi, 1), np.roll(yi, 1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                crosses = ((yi > py) != (yj > py)) & (px < (xj - xi) * (py - yi) / (yj - yi) + xi)
+            odd = (crosses.sum(axis=1) % 2).astype(bool)
+            if ring_no == 0:
+                result[candidates] = odd
+            else:
+                result[candidates] &= ~odd
+        return result
+
+class RegionIndex:
+    """
+    Point-in-polygon classifier for India's states (and districts, when a district
+    layer is available), loaded from GeoJSON boundary files.
+    """
+    def __init__(self, states_path="assets/geo/india_states.geojson",
+                 districts_path="assets/geo/india_districts.geojson", cell_deg=0.25):
+        self.states_path = states_path
+        self.districts_path = districts_path
+        self.cell_deg = cell_deg
+        self.states = None
+        self.districts = None
+
+    @property
+    def loaded(self):
+        return self.states is not None
+
+    @property
+    def signature(self):
+        """Identifies the boundary data in use, so caches of classified points can be invalidated."""
+        if not self.loaded:
+            return "bbox"
+        parts = [self.states_path, str(os.path.getmtime(self.states_path))]
+        if self.districts is not None:
+            parts += [self.districts_path, str(os.path.getmtime(self.districts_path))]
+        return "|".join(parts)
+
+    def _load_layer(self, path, fields):
+        with open(path, "r") as f:
+            collection = json.load(f)
+        layer = _Layer(self.cell_deg)
+        for feature in collection.get("features", []):
+            props = feature.get("properties") or {}
+            name = next((props[k] for k in fields if props.get(k)), None)
+            if name and feature.get("geometry"):
+                layer.add_feature(name, feature["geometry"])
+        layer.prepare()
+        return layer
+
+    def load(self):
+        """Loads the boundary layers. Returns False when no state boundaries are available."""
+        if not os.path.exists(self.states_path):
+            logger.warning(f"No state boundaries at {self.states_path}; falling back to the India bounding box. "
+                           f"Download them with `python -m collectors.india_regions fetch`")
+            return False
+        try:
+            self.states = self._load_layer(self.states_path, STATE_FIELDS)
+            if os.path.exists(self.districts_path):
+                self.districts = self._load_layer(self.districts_path, DISTRICT_FIELDS)
+            logger.info(f"Region index: {len(self.states.polygons)} state polygons, "
+                        f"{len(self.districts.polygons) if self.districts else 0} district polygons")
+            return True
+        except Exception as e:
+            logger.error(f"Region index: failed to load boundaries: {e}")
+            self.states = self.districts = None
+            return False
+
+    def locate(self, lat, lon):
+        """Returns (state, district) for a point, or (None, None) when it lies outside India."""
+        if not self.loaded:
+            return None, None
+        state = self.states.lookup(lon, lat)
+        if state is None:
+            return None, None
+        district = self.districts.lookup(lon, lat) if self.districts else None
+        return state, district
+
+    def locate_many(self, points):
+        """Classifies many (lat, lon) points at once. Returns a list of (state, district)."""
+        points = np.asarray(list(points), dtype=float).reshape(-1, 2)
+        if not self.loaded or not len(points):
+            return [(None, None)] * len(points)
+        lats, lons = points[:, 0], points[:, 1]
+        states = self.states.lookup_many(lons, lats)
+        if self.districts is not None:
+            districts = self.districts.lookup_many(lons, lats)
+            districts[np.equal(states, None)] = None
+        else:
+            districts = np.full(len(points), None, dtype=object)
+        return list(zip(states.tolist(), districts.tolist()))
+
+def fetch_boundaries(path, level="ADM1", url=None, simplified=True):
+    """
+    Downloads a boundary layer as GeoJSON to `path`. Without `url` the current
+    geoBoundaries release for India at `level` is used (simplified geometry unless
+    simplified=False). Any GeoJSON FeatureCollection whose features name their
+    region in one of STATE_FIELDS / DISTRICT_FIELDS works as `url`.
+    Returns the number of features written.
+    """
+    from .http_client import http
+    if url is None:
+        response = http.get(GEOBOUNDARIES_API.format(level=level), timeout=60)
+        response.raise_for_status()
+        meta = response.json()
+        url = meta["simplifiedGeometryGeoJSON" if simplified else "gjDownloadURL"]
+    response = http.get(url, timeout=300)
+    response.raise_for_status()
+    collection = response.json()
+    features = collection.get("features") or []
+    if not features:
+        raise RuntimeError(f"No features in boundary file from {url}")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(collection, f)
+    os.replace(tmp_path, path)
+    logger.info(f"Region index: wrote {len(features)} {level} boundaries from {url} to {path}")
+    return len(features)
+
+if __name__ == "__main__":
+    # python -m collectors.india_regions fetch [states|districts] [geojson url]
+    logging.basicConfig(level=logging.INFO)
+    index = RegionIndex()
+    command = sys.argv[1] if len(sys.argv) > 1 else "fetch"
+    if command == "fetch":
+        layer = sys.argv[2] if len(sys.argv) > 2 else "states"
+        source = sys.argv[3] if len(sys.argv) > 3 else None
+        if layer == "districts":
+            fetch_boundaries(index.districts_path, "ADM2", source)
+        else:
+            fetch_boundaries(index.states_path, "ADM1", source)
+        index.load()
+    else:
+        print(f"Unknown command: {command}")
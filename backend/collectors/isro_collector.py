@@ -1,9 +1,11 @@
-import requests
+from .http_client import http
 from bs4 import BeautifulSoup
 from .pdf_manager import pdf_manager
+from .image_tiles import ImagePyramid
 import logging
+import hashlib
+import uuid
 import os
-import shutil
 
 logger = logging.getLogger(__name__)
 
@@ -11,35 +13,47 @@ class ISROCollector:
     def __init__(self):
         self.base_url = "https://bhuvan-app1.nrsc.gov.in"
         self.disaster_url = "https://bhuvan-app1.nrsc.gov.in/disaster/disaster.php"
+        # Verified Stable URL for Asia Sector IR1 (Commonly used for cyclones/cloud cover)
+        self.satellite_url = "https://mausam.imd.gov.in/Satellite/3Dasiasec_ir1.jpg"
+        self.image_dir = "assets/images"
+        # Zoomable WebP tiles and thumbnails per frame, served as immutable files
+        self.pyramid = ImagePyramid(os.path.join(self.image_dir, "satellite"))
 
     def fetch_data(self):
         """Fetches latest Satellite Image from IMD/ISRO Bhuvan feed."""
         try:
             logger.info("Fetching Satellite data...")
-            # Verified Stable URL for Asia Sector IR1 (Commonly used for cyclones/cloud cover)
-            satellite_url = "https://mausam.imd.gov.in/Satellite/3Dasiasec_ir1.jpg"
-            
             # Since it's a JPG, we can just download it directly or serve the URL
             # To be consistent with "Antigravity App" serving its own assets:
-            
-            import shutil
             local_filename = "satellite_live.jpg"
-            image_path = os.path.join("assets/images", local_filename)
-            
-            response = requests.get(satellite_url, verify=False, stream=True, timeout=15)
-            if response.status_code == 200:
-                with open(image_path, 'wb') as f:
-                    response.raw.decode_content = True
-                    shutil.copyfileobj(response.raw, f)
-                
-                return {
-                    "source": "IMD Satellite",
-                    "type": "satellite_map",
-                    "images": [f"/assets/images/{local_filename}?t={os.path.getmtime(image_path)}"], # Cache bust
-                    "original_url": satellite_url
-                }
-            
-            return None
+            image_path = os.path.join(self.image_dir, local_filename)
+            part_path = f"{image_path}.{uuid.uuid4().hex[:12]}.part"
+
+            with http.get(self.satellite_url, verify=False, stream=True, timeout=15) as response:
+                if response.status_code != 200:
+                    return None
+                # Write to a temporary file and swap it in, so readers never see a partial image
+                digest = hashlib.sha256()
+                try:
+                    with open(part_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=64 * 1024):
+                            digest.update(chunk)
+                            f.write(chunk)
+                    os.replace(part_path, image_path)
+                finally:
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+
+            sha256 = digest.hexdigest()
+            manifest = self.pyramid.publish(image_path, sha256)
+            return {
+                "source": "IMD Satellite",
+                "type": "satellite_map",
+                "images": [f"/assets/images/{local_filename}?v={sha256[:16]}"], # Cache bust by content
+                "tiles": manifest,
+                "thumbnails": manifest["thumbnails"] if manifest else {},
+                "original_url": self.satellite_url
+            }
 
         except Exception as e:
             logger.error(f"Satellite Collection failed: {e}")
@@ -1,15 +1,42 @@
-import requests
+from .http_client import http
 import json
 
 class OSMCollector:
-    def __init__(self):
+    def __init__(self, index=None):
         self.overpass_url = "http://overpass-api.de/api/interpreter"
+        # Optional local InfrastructureIndex; used instead of Overpass when loaded
+        self.index = index
+
+    def _to_infrastructure(self, el):
+        return {
+            "type": "infrastructure",
+            "category": el.get('tags', {}).get('amenity', 'unknown'),
+            "name": el.get('tags', {}).get('name', 'Unknown Facility'),
+            "lat": el.get('lat'),
+            "lon": el.get('lon'),
+            "details": el.get('tags', {})
+        }
 
     def fetch_infrastructure(self, lat, lon, radius=5000):
         """
         Fetches critical infrastructure (Hospitals, Police, Fire) around a coordinate.
-        Radius is in meters.
+        Radius is in meters. Served from the local index when one is loaded.
+        Returns None when Overpass fails, so a rate-limited lookup is never cached as "nothing nearby".
         """
+        if self.index is not None and self.index.loaded:
+            return [self._to_infrastructure(node) for _, node in self.index.within_radius(lat, lon, radius)]
+        return self._fetch_overpass(lat, lon, radius)
+
+    def nearest_infrastructure(self, lat, lon, k=10):
+        """Returns the k nearest facilities. Requires the local index."""
+        if self.index is None or not self.index.loaded:
+            return []
+        return [
+            {**self._to_infrastructure(node), "distance_m": round(d)}
+            for d, node in self.index.nearest(lat, lon, k)
+        ]
+
+    def _fetch_overpass(self, lat, lon, radius):
         # Overpass QL Query
         query = f"""
         [out:json];
@@ -24,34 +51,25 @@ class OSMCollector:
         """
         
         try:
-            response = requests.post(self.overpass_url, data={'data': query}, timeout=25)
+            response = http.post(self.overpass_url, data={'data': query}, timeout=25)
             if response.status_code == 200:
                 data = response.json()
                 elements = data.get('elements', [])
                 
-                infrastructure = []
-                for el in elements:
-                    infrastructure.append({
-                        "type": "infrastructure",
-                        "category": el.get('tags', {}).get('amenity', 'unknown'),
-                        "name": el.get('tags', {}).get('name', 'Unknown Facility'),
-                        "lat": el.get('lat'),
-                        "lon": el.get('lon'),
-                        "details": el.get('tags', {})
-                    })
-                    
+                infrastructure = [self._to_infrastructure(el) for el in elements]
+
                 print(f"OSM: Found {len(infrastructure)} infrastructure points nearby.")
                 return infrastructure
             else:
                 print(f"OSM: API Error {response.status_code}")
-                return []
+                return None
                 
         except Exception as e:
             print(f"OSM: Exception - {e}")
-            return []
+            return None
 
 if __name__ == "__main__":
     # Test with coordinates for New Delhi
     collector = OSMCollector()
     results = collector.fetch_infrastructure(28.6139, 77.2090)
-    print(results[:5])
+    print((results or [])[:5])
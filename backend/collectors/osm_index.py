@@ -0,0 +1,236 @@
+import os
+import sys
+import json
+import math
+import logging
+from .http_client import http
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+AMENITIES = ("hospital", "police", "fire_station")
+EARTH_RADIUS_M = 6371000
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+class InfrastructureIndex:
+    """
+    On-disk grid index of OSM hospitals, police and fire stations for India.
+    Nodes are bucketed into `cell_deg` cells so radius and k-nearest queries only
+    scan the cells around the query point instead of asking Overpass.
+    """
+    def __init__(self, index_path="data/osm_infrastructure_index.json", cell_deg=0.1):
+        self.index_path = index_path
+        self.cell_deg = cell_deg
+        self.overpass_url = "http://overpass-api.de/api/interpreter"
+        # (nodes, cells): osm id -> {"id", "lat", "lon", "tags"} and (row, col) -> [osm id].
+        # Never mutated once published; updates build new dicts and swap the pair in one
+        # assignment, so queries running during a refresh see either the old or the new index.
+        self._grid = ({}, {})
+        self.updated_at = None
+
+    @property
+    def nodes(self):
+        return self._grid[0]
+
+    @property
+    def cells(self):
+        return self._grid[1]
+
+    @property
+    def loaded(self):
+        return bool(self.nodes)
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def _publish(self, nodes):
+        cells = {}
+        for node_id, node in nodes.items():
+            cells.setdefault(self._cell(node["lat"], node["lon"]), []).append(node_id)
+        self._grid = (nodes, cells)
+
+    def _upsert(self, elements, replace=False):
+        """Merges elements into a copy of the current nodes (or a fresh set) and publishes it."""
+        nodes = {} if replace else dict(self.nodes)
+        count = 0
+        for el in elements:
+            if el.get("type", "node") != "node" or el.get("lat") is None:
+                continue
+            if el.get("tags", {}).get("amenity") not in AMENITIES:
+                continue
+            nodes[str(el["id"])] = {"id": el["id"], "lat": el["lat"], "lon": el["lon"], "tags": el.get("tags", {})}
+            count += 1
+        self._publish(nodes)
+        return count
+
+    # --- Persistence ---
+
+    def load(self):
+        """Loads the index from disk. Returns False when no index has been built yet."""
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+            self._publish({str(n["id"]): n for n in data.get("nodes", [])})
+            self.updated_at = data.get("updated_at")
+            logger.info(f"OSM index: loaded {len(self.nodes)} nodes (updated {self.updated_at})")
+            return True
+        except Exception as e:
+            logger.error(f"OSM index: failed to load {self.index_path}: {e}")
+            return False
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"updated_at": self.updated_at, "nodes": list(self.nodes.values())}, f)
+        os.replace(tmp_path, self.index_path)
+
+    # --- Bulk load / refresh ---
+
+    def _overpass_query(self, newer_than=None):
+        newer = f'(newer:"{newer_than}")' if newer_than else ""
+        return f"""
+        [out:json][timeout:900];
+        area["ISO3166-1"="IN"][admin_level=2]->.india;
+        (
+          node["amenity"~"^({'|'.join(AMENITIES)})$"](area.india){newer};
+        );
+        out body;
+        """
+
+    def _fetch_overpass(self, newer_than=None):
+        response = http.post(self.overpass_url, data={"data": self._overpass_query(newer_than)}, timeout=960, retries=1)
+        response.raise_for_status()
+        return response.json().get("elements", [])
+
+    def build_from_overpass(self):
+        """Downloads every matching node in India in one Overpass call and replaces the index."""
+        started = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        elements = self._fetch_overpass()
+        count = self._upsert(elements, replace=True)
+        self.updated_at = started
+        self.save()
+        logger.info(f"OSM index: built from Overpass with {count} nodes")
+        return count
+
+    def build_from_file(self, path):
+        """Builds the index from an Overpass JSON dump, a .osm XML extract or a .pbf extract."""
+        if path.endswith(".json"):
+            with open(path, "r") as f:
+                elements = json.load(f).get("elements", [])
+        elif path.endswith(".pbf"):
+            elements = self._read_pbf(path)
+        else:
+            elements = self._read_osm_xml(path)
+        count = self._upsert(elements, replace=True)
+        self.updated_at = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.save()
+        logger.info(f"OSM index: built from {path} with {count} nodes")
+        return count
+
+    def _read_osm_xml(self, path):
+        import xml.etree.ElementTree as ET
+        elements = []
+        for _, elem in ET.iterparse(path, events=("end",)):
+            if elem.tag == "node":
+                tags = {t.get("k"): t.get("v") for t in elem.findall("tag")}
+                if tags.get("amenity") in AMENITIES:
+                    elements.append({"type": "node", "id": int(elem.get("id")), "lat": float(elem.get("lat")), "lon": float(elem.get("lon")), "tags": tags})
+                elem.clear()
+            elif elem.tag in ("way", "relation"):
+                elem.clear()
+        return elements
+
+    def _read_pbf(self, path):
+        try:
+            import osmium
+        except ImportError:
+            raise RuntimeError("Reading .pbf extracts requires the 'osmium' package")
+
+        elements = []
+        for obj in osmium.FileProcessor(path, osmium.osm.NODE):
+            tags = dict(obj.tags)
+            if tags.get("amenity") in AMENITIES:
+                elements.append({"type": "node", "id": obj.id, "lat": obj.location.lat, "lon": obj.location.lon, "tags": tags})
+        return elements
+
+    def refresh(self):
+        """
+        Pulls nodes changed since the last build/refresh and merges them in.
+        Deleted nodes are only dropped by a full rebuild.
+        """
+        if not self.loaded:
+            return 0
+        started = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        try:
+            count = self._upsert(self._fetch_overpass(newer_than=self.updated_at))
+        except Exception as e:
+            logger.error(f"OSM index: refresh failed: {e}")
+            return 0
+        self.updated_at = started
+        self.save()
+        logger.info(f"OSM index: refreshed {count} changed nodes")
+        return count
+
+    # --- Queries ---
+
+    def _candidates(self, lat, lon, radius_m):
+        nodes, cells = self._grid
+        lat = min(90.0, max(-90.0, lat))
+        dlat = min(radius_m / 111320.0, 180.0)
+        dlon = min(dlat / max(math.cos(math.radians(lat)), 0.01), 360.0)
+        row_min, col_min = self._cell(lat - dlat, lon - dlon)
+        row_max, col_max = self._cell(lat + dlat, lon + dlon)
+        # Near the poles or for huge radii the box spans more cells than the index holds;
+        # walking the occupied cells instead keeps the cost bounded by the index size
+        if (row_max - row_min + 1) * (col_max - col_min + 1) > len(cells):
+            keys = [k for k in cells if row_min <= k[0] <= row_max and col_min <= k[1] <= col_max]
+        else:
+            keys = ((row, col) for row in range(row_min, row_max + 1) for col in range(col_min, col_max + 1))
+        for key in keys:
+            for node_id in cells.get(key, ()):
+                yield nodes[node_id]
+
+    def within_radius(self, lat, lon, radius_m):
+        """Returns (distance_m, node) pairs within radius_m, nearest first."""
+        hits = []
+        for node in self._candidates(lat, lon, radius_m):
+            d = haversine_m(lat, lon, node["lat"], node["lon"])
+            if d <= radius_m:
+                hits.append((d, node))
+        hits.sort(key=lambda h: h[0])
+        return hits
+
+    def nearest(self, lat, lon, k=10, max_radius_m=200000):
+        """Returns the k nearest (distance_m, node) pairs, widening the search until k are found."""
+        radius = self.cell_deg * 111320
+        while True:
+            hits = self.within_radius(lat, lon, radius)
+            if len(hits) >= k or radius >= max_radius_m:
+                return hits[:k]
+            radius = min(radius * 2, max_radius_m)
+
+if __name__ == "__main__":
+    # python -m collectors.osm_index build [extract.osm|extract.pbf|dump.json]
+    # python -m collectors.osm_index refresh
+    logging.basicConfig(level=logging.INFO)
+    index = InfrastructureIndex()
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    if command == "build":
+        if len(sys.argv) > 2:
+            index.build_from_file(sys.argv[2])
+        else:
+            index.build_from_overpass()
+    elif command == "refresh":
+        index.load()
+        index.refresh()
+    else:
+        print(f"Unknown command: {command}")
@@ -1,39 +1,70 @@
-import requests
+from .http_client import http
 # from pdf2image import convert_from_path
 import os
+import re
+import time
+import uuid
+import hashlib
 import logging
-from datetime import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from .artifact_cache import ArtifactCache
+from metrics import PDF_RENDER_SECONDS, PDF_PAGES_RENDERED, BULLETIN_PARSE_SECONDS
 
 logger = logging.getLogger(__name__)
 
+IMAGE_FORMATS = {"png": ("PNG", "png"), "jpeg": ("JPEG", "jpg"), "webp": ("WEBP", "webp")}
+
+# Render workers must not be forked from the API process: its collector, server and
+# connection-pool threads may hold locks that would stay locked forever in the child
+MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+def _render_page(pdf_path, page, dpi, image_format, quality, image_path):
+    """Renders a single page in a worker process and writes it straight to disk."""
+    from pdf2image import convert_from_path
+    pil_format, _ = IMAGE_FORMATS[image_format]
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=page, last_page=page, thread_count=1)
+    try:
+        image = images[0]
+        if pil_format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        image.save(image_path, pil_format, quality=quality)
+    finally:
+        for image in images:
+            image.close()
+    return image_path
+
 class PDFManager:
-    def __init__(self, storage_dir="assets/images"):
+    def __init__(self, storage_dir="assets/images", dpi=150, image_format="webp", quality=80,
+                 max_workers=None, memory_limit_mb=1024, artifact_cache=None):
         self.storage_dir = storage_dir
+        self.artifacts = artifact_cache or ArtifactCache()
+        self.dpi = dpi
+        self.image_format = image_format
+        self.quality = quality
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Upper bound for decoded page bitmaps held by all render workers at once
+        self.memory_limit_mb = memory_limit_mb
         os.makedirs(self.storage_dir, exist_ok=True)
         os.makedirs("temp_pdfs", exist_ok=True)
 
-    def download_pdf(self, url: str, filename: str) -> str:
-        """Downloads a PDF from a URL."""
-        try:
-            response = requests.get(url, verify=False, timeout=30)
-            response.raise_for_status()
-            pdf_path = os.path.join("temp_pdfs", f"{filename}.pdf")
-            with open(pdf_path, 'wb') as f:
-                f.write(response.content)
-            logger.info(f"Downloaded PDF: {url}")
-            return pdf_path
-        except Exception as e:
-            logger.error(f"Failed to download PDF {url}: {e}")
-            return None
+    def _page_bytes(self, info):
+        """Estimated RGB bitmap size of one page at the configured DPI."""
+        match = re.match(r"([\d.]+) x ([\d.]+)", str(info.get("Page size", "")))
+        width_pt, height_pt = (float(match.group(1)), float(match.group(2))) if match else (612.0, 792.0)
+        return int(width_pt / 72 * self.dpi) * int(height_pt / 72 * self.dpi) * 3
 
-    def convert_to_images(self, pdf_path: str, base_filename: str):
-        """Converts PDF to images and saves them."""
-        if not pdf_path:
-            return []
-        
+    def _worker_count(self, pages, page_bytes):
+        budget = self.memory_limit_mb * 1024 * 1024
+        return max(1, min(self.max_workers, pages, budget // max(page_bytes, 1)))
+
+    def _render_pages(self, pdf_path, name_for_page):
+        """Renders every page to storage_dir, naming them name_for_page(page, extension)."""
         try:
             # Import here to avoid top-level crash if library/poppler is missing
-            from pdf2image import convert_from_path
+            from pdf2image import pdfinfo_from_path
         except ImportError:
             logger.warning("pdf2image module not found. Skipping conversion.")
             return []
@@ -44,28 +75,142 @@ class PDFManager:
         try:
             # Poppler path might need configuration on Windows if not in PATH
             # Assuming it's in a standard location or PATH for now
-            images = convert_from_path(pdf_path)
-            saved_paths = []
-            
-            for i, image in enumerate(images):
-                # Save as timestamped file to avoid caching issues
-                timestamp = int(datetime.now().timestamp())
-                image_name = f"{base_filename}_page_{i+1}_{timestamp}.png"
-                image_path = os.path.join(self.storage_dir, image_name)
-                image.save(image_path, "PNG")
-                saved_paths.append(f"/assets/images/{image_name}")
-            
-            return saved_paths
+            info = pdfinfo_from_path(pdf_path)
+            pages = int(info.get("Pages", 0))
+            workers = self._worker_count(pages, self._page_bytes(info))
+            _, extension = IMAGE_FORMATS[self.image_format]
+            image_names = [name_for_page(page, extension) for page in range(1, pages + 1)]
+
+            # One page per task so each worker holds a single decoded bitmap at a time
+            started = time.monotonic()
+            with ProcessPoolExecutor(max_workers=workers, mp_context=MP_CONTEXT) as pool:
+                futures = [
+                    pool.submit(_render_page, pdf_path, page, self.dpi, self.image_format, self.quality,
+                                os.path.join(self.storage_dir, name))
+                    for page, name in enumerate(image_names, start=1)
+                ]
+                for future in futures:
+                    future.result()
+
+            PDF_RENDER_SECONDS.observe(time.monotonic() - started)
+            PDF_PAGES_RENDERED.inc(pages)
+            logger.info(f"Rendered {pages} pages of {pdf_path} with {workers} workers")
+            return [f"/assets/images/{name}" for name in image_names]
         except Exception as e:
             logger.error(f"Failed to convert PDF {pdf_path}: {e}")
             return []
+
+    def _has_pages(self, artifact):
+        pages = (artifact or {}).get("pages")
+        return bool(pages) and all(os.path.exists(os.path.join(self.storage_dir, os.path.basename(p))) for p in pages)
+
+    def _satisfies(self, artifact, needs):
+        """Whether a cached artifact already holds everything in needs ("pages", "records")."""
+        if not artifact:
+            return False
+        if "records" in needs and "records" not in artifact:
+            return False
+        return "pages" not in needs or self._has_pages(artifact)
+
+    def _download_if_changed(self, url, filename, needs=("pages",)):
+        """
+        Conditional, hashing download. Returns (pdf_path, sha256, unchanged);
+        pdf_path is None when the server answered 304 or the content hash is already
+        known with everything in needs.
+        """
+        # Unique per call, so overlapping downloads of the same source never share a file
+        temp_name = f"{filename}.{uuid.uuid4().hex[:12]}"
+        part_path = os.path.join("temp_pdfs", f"{temp_name}.pdf.part")
+        try:
+            with http.get(url, verify=False, timeout=30, stream=True, headers=self.artifacts.validators(url)) as response:
+                if response.status_code == 304:
+                    return None, self.artifacts.sha_for_url(url), True
+                response.raise_for_status()
+                digest = hashlib.sha256()
+                with open(part_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        digest.update(chunk)
+                        f.write(chunk)
+                etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        except Exception as e:
+            logger.error(f"Failed to download PDF {url}: {e}")
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            return None, None, False
+
+        sha256 = digest.hexdigest()
+        self.artifacts.remember_url(url, sha256, etag, last_modified)
+        if self._satisfies(self.artifacts.get(sha256), needs):
+            os.remove(part_path)
+            return None, sha256, True
+
+        pdf_path = os.path.join("temp_pdfs", f"{temp_name}.pdf")
+        os.replace(part_path, pdf_path)
+        logger.info(f"Downloaded PDF: {url}")
+        return pdf_path, sha256, False
+
+    def fetch_pages(self, url: str, source: str):
+        """
+        Downloads and renders a bulletin only if its content changed.
+        Returns the list of page image URLs, or None if the download failed.
+        """
+        bulletin = self.fetch_bulletin(url, source)
+        return bulletin["pages"] if bulletin is not None else None
+
+    def fetch_bulletin(self, url: str, source: str, parser=None, render_images=True):
+        """
+        Downloads a bulletin only if its content changed, then extracts records with
+        parser(pdf_path) and/or renders its pages. Both are cached by content hash, so an
+        unchanged bulletin is neither parsed nor rendered again. When a parser is given
+        and finds nothing, the pages are rendered as a fallback even if render_images is off.
+        Returns {"sha256", "pages", "records"}, or None if the download failed.
+        """
+        needs = (["records"] if parser else []) + (["pages"] if render_images else [])
+        pdf_path, sha256, unchanged = self._download_if_changed(url, source, needs)
+        if unchanged:
+            artifact = self.artifacts.get(sha256) or {}
+            if self._satisfies(artifact, needs):
+                logger.info(f"{source}: bulletin unchanged ({sha256[:12]}), reusing cached results")
+                return {"sha256": sha256, "pages": artifact.get("pages", []), "records": artifact.get("records")}
+            # Validators matched but the cached results are gone; fetch again without them
+            self.artifacts.remember_url(url, None)
+            pdf_path, sha256, unchanged = self._download_if_changed(url, source, needs)
+        if not pdf_path:
+            return None
+
+        known = self.artifacts.get(sha256) or {}
+        fields = {"url": url}
+        try:
+            records = known.get("records")
+            if parser and records is None:
+                try:
+                    with BULLETIN_PARSE_SECONDS.labels(source).time():
+                        records = fields["records"] = parser(pdf_path)
+                    logger.info(f"{source}: extracted {len(records)} records from {sha256[:12]}")
+                except Exception as e:
+                    logger.error(f"{source}: failed to parse {pdf_path}: {e}")
+            if (render_images or (parser and not records)) and not self._has_pages(known):
+                # Page images are named by content hash, so an unchanged bulletin maps to the same files
+                pages = self._render_pages(pdf_path, lambda page, ext: f"{source}_{sha256[:16]}_p{page}.{ext}")
+                if pages:
+                    fields["pages"] = pages
         finally:
-            # Cleanup PDF
             if os.path.exists(pdf_path):
-                try:
-                    os.remove(pdf_path)
-                except:
-                    pass
+                os.remove(pdf_path)
+        artifact = self.artifacts.put(sha256, source, **fields)
+        self.gc()
+        return {"sha256": sha256, "pages": artifact.get("pages", []), "records": artifact.get("records")}
+
+    def gc(self):
+        """Applies the artifact retention policy and clears out legacy timestamp-named pages."""
+        removed = self.artifacts.gc(self.storage_dir)
+        cutoff = time.time() - self.artifacts.retention_days * 86400
+        for name in os.listdir(self.storage_dir):
+            path = os.path.join(self.storage_dir, name)
+            if re.search(r"_page_\d+_\d+\.(png|jpg|webp)$", name) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        return removed
 
 try:
     pdf_manager = PDFManager()
@@ -1,47 +1,65 @@
-import requests
+from .http_client import http
 
 class WeatherCollector:
     def __init__(self):
         self.api_url = "https://api.open-meteo.com/v1/forecast"
+        self.timeout = 10
+        # Open-Meteo accepts comma separated coordinate lists; keep chunks well below URL length limits
+        self.max_batch_size = 100
 
-    def fetch_weather(self, lat, lon):
-        """
-        Fetches current weather and short-term forecast for a specific location.
-        """
-        params = {
+    def _params(self, lat, lon):
+        return {
             "latitude": lat,
             "longitude": lon,
             "current": "temperature_2m,relative_humidity_2m,precipitation,rain,wind_speed_10m,wind_direction_10m,soil_moisture_0_to_1cm",
             "hourly": "visibility",
+            "daily": "precipitation_sum",
             "forecast_days": 1
         }
-        
+
+    def _parse(self, lat, lon, data):
+        current = data.get('current', {})
+        daily_rain = data.get('daily', {}).get('precipitation_sum') or [None]
+
+        weather_data = {
+            "lat": lat,
+            "lon": lon,
+            "temp_c": current.get('temperature_2m'),
+            "humidity": current.get('relative_humidity_2m'),
+            "precip_mm": current.get('precipitation'),
+            "precip_24h_mm": daily_rain[0],
+            "wind_kph": current.get('wind_speed_10m'),
+            "soil_moisture": current.get('soil_moisture_0_to_1cm'),
+            "timestamp": current.get('time')
+        }
+        # Simple Risk logic; Open-Meteo reports null for values a location does not have
+        wind = weather_data['wind_kph'] or 0
+        precip = weather_data['precip_mm'] or 0
+        risk_level = "Low"
+        if wind > 50 or precip > 50:
+            risk_level = "High"
+        elif wind > 30 or precip > 20:
+            risk_level = "Medium"
+
+        weather_data['risk_level'] = risk_level
+        return weather_data
+
+    def _parse_point(self, lat, lon, data):
+        # One malformed location must not cost the rest of its chunk
         try:
-            response = requests.get(self.api_url, params=params)
+            return self._parse(lat, lon, data)
+        except Exception as e:
+            print(f"Weather: Unparseable location {lat},{lon} - {e}")
+            return None
+
+    def fetch_weather(self, lat, lon):
+        """
+        Fetches current weather and short-term forecast for a specific location.
+        """
+        try:
+            response = http.get(self.api_url, params=self._params(lat, lon), timeout=self.timeout)
             if response.status_code == 200:
-                data = response.json()
-                current = data.get('current', {})
-                
-                weather_data = {
-                    "lat": lat,
-                    "lon": lon,
-                    "temp_c": current.get('temperature_2m'),
-                    "humidity": current.get('relative_humidity_2m'),
-                    "precip_mm": current.get('precipitation'),
-                    "wind_kph": current.get('wind_speed_10m'),
-                    "soil_moisture": current.get('soil_moisture_0_to_1cm'),
-                    "timestamp": current.get('time')
-                }
-                # Simple Risk logic
-                risk_level = "Low"
-                if weather_data['wind_kph'] > 50 or weather_data['precip_mm'] > 50:
-                    risk_level = "High"
-                elif weather_data['wind_kph'] > 30 or weather_data['precip_mm'] > 20:
-                    risk_level = "Medium"
-                
-                weather_data['risk_level'] = risk_level
-                
-                return weather_data
+                return self._parse(lat, lon, response.json())
             else:
                 print(f"Weather: API Error {response.status_code}")
                 return None
@@ -49,6 +67,42 @@ class WeatherCollector:
             print(f"Weather: Exception - {e}")
             return None
 
+    def fetch_weather_batch(self, points):
+        """
+        Fetches weather for many (lat, lon) points, packing up to `max_batch_size`
+        coordinates into each Open-Meteo request.
+        Returns a list aligned with `points`; entries are None where a chunk failed.
+        """
+        points = list(points)
+        results = []
+        for start in range(0, len(points), self.max_batch_size):
+            chunk = points[start:start + self.max_batch_size]
+            results.extend(self._fetch_chunk(chunk))
+        return results
+
+    def _fetch_chunk(self, chunk):
+        params = self._params(
+            ",".join(str(lat) for lat, _ in chunk),
+            ",".join(str(lon) for _, lon in chunk)
+        )
+        try:
+            response = http.get(self.api_url, params=params, timeout=self.timeout)
+            if response.status_code == 200:
+                data = response.json()
+                # A single coordinate comes back as an object, several as a list in request order
+                if isinstance(data, dict):
+                    data = [data]
+                if len(data) != len(chunk):
+                    print(f"Weather: Batch returned {len(data)} locations for {len(chunk)} points")
+                    return [None] * len(chunk)
+                return [self._parse_point(lat, lon, item) for (lat, lon), item in zip(chunk, data)]
+            else:
+                print(f"Weather: Batch API Error {response.status_code}")
+                return [None] * len(chunk)
+        except Exception as e:
+            print(f"Weather: Batch Exception - {e}")
+            return [None] * len(chunk)
+
 if __name__ == "__main__":
     # Test for Kolkata
     collector = WeatherCollector()
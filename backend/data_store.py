@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS alerts (
+    episode_id TEXT PRIMARY KEY,
+    event_type TEXT,
+    name TEXT,
+    severity TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS alerts_last_seen ON alerts (last_seen);
+"""
+
+class DataStore:
+    """
+    SQLite (WAL mode) store for collection snapshots and alert history.
+    Each sync is one atomic transaction, so readers never see a half-written payload.
+    The latest snapshot is kept parsed in memory and only re-read when another
+    connection (e.g. another worker) has committed since.
+    """
+    def __init__(self, db_path="data/nexus.db", keep_snapshots=672):
+        self.db_path = db_path
+        # 672 snapshots = one week of 15 minute cycles
+        self.keep_snapshots = keep_snapshots
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._cached = None
+        self._cached_id = 0
+        self._cached_version = None
+
+    def _data_version(self):
+        # Changes whenever another connection commits; our own writes refresh the cache directly
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def save(self, data):
+        """Stores a snapshot and upserts its alerts into the history table. Returns the snapshot id."""
+        now = time.time()
+        payload = json.dumps(data)
+        with self._lock:
+            with self._conn:
+                cur = self._conn.execute("INSERT INTO snapshots (created_at, payload) VALUES (?, ?)", (now, payload))
+                snapshot_id = cur.lastrowid
+                for alert in data.get("alerts", []):
+                    episode_id = alert.get("metadata", {}).get("episode_id")
+                    if episode_id is None:
+                        continue
+                    self._conn.execute(
+                        """INSERT INTO alerts (episode_id, event_type, name, severity, first_seen, last_seen, payload)
+                           VALUES (?, ?, ?, ?, ?, ?, ?)
+                           ON CONFLICT(episode_id) DO UPDATE SET
+                               severity = excluded.severity, last_seen = excluded.last_seen, payload = excluded.payload""",
+                        (str(episode_id), alert.get("event_type"), alert.get("name"), alert.get("severity"), now, now, json.dumps(alert))
+                    )
+                self._conn.execute("DELETE FROM snapshots WHERE id <= ?", (snapshot_id - self.keep_snapshots,))
+            self._cached = data
+            self._cached_id = snapshot_id
+            self._cached_version = self._data_version()
+        return snapshot_id
+
+    def latest(self):
+        """Returns the most recent snapshot (parsed), or {} if nothing has been stored."""
+        return self.latest_with_id()[1]
+
+    def latest_with_id(self):
+        """Returns (snapshot id, snapshot) of the most recent snapshot, read together; (0, {}) when empty."""
+        with self._lock:
+            version = self._data_version()
+            if self._cached is not None and version == self._cached_version:
+                return self._cached_id, self._cached
+            row = self._conn.execute("SELECT id, payload FROM snapshots ORDER BY id DESC LIMIT 1").fetchone()
+            self._cached_id, self._cached = (row[0], json.loads(row[1])) if row else (0, {})
+            self._cached_version = version
+            return self._cached_id, self._cached
+
+    def snapshots_since(self, snapshot_id, limit=100):
+        """Returns up to `limit` (id, snapshot) pairs from `snapshot_id` onwards, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload FROM snapshots WHERE id >= ? ORDER BY id LIMIT ?", (snapshot_id, limit)
+            ).fetchall()
+        return [(row_id, json.loads(payload)) for row_id, payload in rows]
+
+    def alert_history(self, since=None, limit=500):
+        """Alerts seen at or after `since` (unix time), most recently seen first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload, first_seen, last_seen FROM alerts WHERE last_seen >= ? ORDER BY last_seen DESC LIMIT ?",
+                (since or 0, limit)
+            ).fetchall()
+        return [{**json.loads(p), "first_seen": first, "last_seen": last} for p, first, last in rows]
+
+    def import_json(self, path):
+        """Seeds an empty store from a legacy data_store.json file."""
+        with self._lock:
+            has_data = self._conn.execute("SELECT 1 FROM snapshots LIMIT 1").fetchone()
+        if has_data or not os.path.exists(path):
+            return False
+        try:
+            with open(path, 'r') as f:
+                self.save(json.load(f))
+            logger.info(f"Imported legacy data from {path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to import {path}: {e}")
+            return False
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,176 @@
+import json
+import asyncio
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _alerts_by_episode(snapshot):
+    alerts = {}
+    for alert in snapshot.get("alerts", []):
+        episode_id = alert.get("metadata", {}).get("episode_id")
+        if episode_id is not None:
+            alerts[str(episode_id)] = alert
+    return alerts
+
+def diff_snapshots(old, new):
+    """
+    Returns the changes between two collection snapshots, or None if nothing changed:
+    GDACS alerts keyed by episode_id (new / updated / resolved) and changed key_metrics entries.
+    """
+    old_alerts = _alerts_by_episode(old or {})
+    new_alerts = _alerts_by_episode(new or {})
+    old_metrics = (old or {}).get("key_metrics", {})
+    new_metrics = (new or {}).get("key_metrics", {})
+
+    delta = {
+        "alerts_new": [a for k, a in new_alerts.items() if k not in old_alerts],
+        "alerts_updated": [a for k, a in new_alerts.items() if k in old_alerts and a != old_alerts[k]],
+        "alerts_resolved": [k for k in old_alerts if k not in new_alerts],
+        "metrics_changed": {k: v for k, v in new_metrics.items() if old_metrics.get(k) != v},
+        "metrics_removed": [k for k in old_metrics if k not in new_metrics],
+    }
+    if not any(delta.values()):
+        return None
+    delta["last_updated"] = (new or {}).get("last_updated")
+    return delta
+
+class _Client:
+    def __init__(self, loop, max_queue):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue)
+
+    def offer(self, event):
+        # Runs on the client's event loop. A client that has fallen max_queue events behind
+        # gets its backlog dropped and a single resync marker instead of unbounded buffering.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(("resync", None, None))
+
+class DeltaBroadcaster:
+    """
+    Pushes collection deltas to connected Server-Sent Events clients.
+    Deltas are derived from the snapshots in the shared DataStore, not handed over by
+    the sync, so every API worker streams them and not only the one that collected:
+    each process polls the store, diffs consecutive snapshots and fans the result out
+    to its own clients. Event ids are snapshot ids; a client reconnecting to any worker
+    with an id still in the store gets the missed deltas replayed, otherwise (pruned,
+    or too far behind) it gets a fresh full snapshot.
+    """
+    def __init__(self, store, poll_interval=2, max_replay=96, max_queue=32, heartbeat=15):
+        self.store = store
+        self.poll_interval = poll_interval
+        self.max_replay = max_replay
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+        self._last_id = None  # newest snapshot id fanned out by this process
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._poller = None
+
+    def notify(self):
+        """Polls the store now instead of at the next interval. Call after saving a snapshot."""
+        self._wake.set()
+
+    def _start_poller(self):
+        # Called with the lock held; the poller only runs in processes that have streaming clients
+        if self._poller is None:
+            self._last_id = self.store.latest_with_id()[0]
+            self._poller = threading.Thread(target=self._poll_loop, name="sse-poller", daemon=True)
+            self._poller.start()
+
+    def _poll_loop(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                self._poll()
+            except Exception as e:
+                logger.error(f"SSE poll failed: {e}")
+
+    def _poll(self):
+        latest_id, _ = self.store.latest_with_id()
+        if latest_id == self._last_id:
+            return
+        found = self._deltas_since(self._last_id)
+        if found is None:
+            # Missed more than can be replayed; clients fetch a full snapshot instead
+            events, self._last_id = [("resync", latest_id, None)], latest_id
+        else:
+            events, self._last_id = found
+        with self._lock:
+            clients = list(self._clients)
+        for event in events:
+            for client in clients:
+                try:
+                    client.loop.call_soon_threadsafe(client.offer, event)
+                except RuntimeError:
+                    # Loop already closed; the client is dropped when its generator exits
+                    pass
+
+    def _deltas_since(self, snapshot_id):
+        """
+        Returns (delta events after snapshot_id, newest snapshot id), or None when
+        snapshot_id is no longer in the store or more than max_replay snapshots behind.
+        """
+        rows = self.store.snapshots_since(snapshot_id, limit=self.max_replay + 1)
+        if not rows or rows[0][0] != snapshot_id or len(rows) > self.max_replay:
+            return None
+        events = []
+        for (_, old), (new_id, new) in zip(rows, rows[1:]):
+            delta = diff_snapshots(old, new)
+            if delta:
+                events.append(("delta", new_id, delta))
+        return events, rows[-1][0]
+
+    def _replay(self, last_event_id):
+        try:
+            return self._deltas_since(int(last_event_id))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _format(kind, seq_token, data):
+        return f"id: {seq_token}\nevent: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+    async def stream(self, request, last_event_id=None):
+        """Async generator of SSE frames for one client."""
+        client = _Client(asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._start_poller()
+            self._clients.add(client)
+
+        try:
+            # Read after registering, so nothing published from here on is missed.
+            # `sent` is the snapshot id the client is up to; queued events at or
+            # before it are already covered and skipped.
+            backlog = self._replay(last_event_id) if last_event_id else None
+            if backlog is None:
+                sent, snapshot = self.store.latest_with_id()
+                yield self._format("snapshot", sent, snapshot)
+            else:
+                events, sent = backlog
+                for _, seq, delta in events:
+                    yield self._format("delta", seq, delta)
+
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    kind, seq, delta = await asyncio.wait_for(client.queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if kind == "resync":
+                    sent, snapshot = self.store.latest_with_id()
+                    yield self._format("snapshot", sent, snapshot)
+                elif seq > sent:
+                    sent = seq
+                    yield self._format(kind, seq, delta)
+        finally:
+            with self._lock:
+                self._clients.discard(client)
@@ -0,0 +1,160 @@
+import os
+import time
+import hashlib
+import threading
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FEATURE_COLUMNS = ['rainfall_mm', 'seismic_magnitude', 'soil_moisture', 'river_level_m']
+
+# Mocking values based on typical state profiles; used for any feature without live data
+STATE_PROFILES = {
+    "Tamil Nadu": [45, 1.2, 30, 4], # Currently calm
+    "Assam": [160, 3.4, 85, 7.8],   # Flood risk
+    "Uttarakhand": [140, 4.1, 75, 5], # Landslide risk
+    "Gujarat": [10, 2.1, 20, 2],    # Safe
+    "Maharashtra": [80, 2.5, 40, 5], # Moderate
+    "Kerala": [120, 1.5, 65, 6],     # Watch
+    "Delhi": [25, 1.1, 10, 3],       # Safe
+    "Odisha": [90, 1.3, 50, 6],      # Moderate
+}
+DEFAULT_PROFILE = [50, 2.0, 40, 4]
+
+# Weather sampling points per state, fetched on every sync alongside the major cities
+STATE_MONITORING_POINTS = {
+    "Tamil Nadu": [(13.08, 80.27), (9.93, 78.12), (11.02, 76.96)],
+    "Assam": [(26.14, 91.74), (27.47, 94.91), (24.83, 92.78)],
+    "Uttarakhand": [(30.32, 78.03), (30.73, 79.07), (29.38, 79.46)],
+    "Gujarat": [(23.02, 72.57), (21.17, 72.83), (22.31, 70.80)],
+    "Maharashtra": [(19.07, 72.87), (18.52, 73.86), (21.15, 79.09)],
+    "Kerala": [(8.52, 76.94), (9.93, 76.26), (11.25, 75.78)],
+    "Delhi": [(28.61, 77.20)],
+    "Odisha": [(20.30, 85.82), (19.31, 84.79), (21.49, 86.93)],
+}
+
+def river_stage(station):
+    """
+    Maps a gauge reading onto the model's river_level_m scale, where warning level is 6,
+    danger level is 8 and above 8 is flood. Gauges report metres above sea level, so the
+    raw reading is not comparable across stations.
+    """
+    current, warning, danger = station.get("current_level"), station.get("warning_level"), station.get("danger_level")
+    if current is None or (warning is None and danger is None):
+        return None
+    if warning is None or danger is None or danger <= warning:
+        reference = danger if danger is not None else warning
+        anchor = 8.0 if danger is not None else 6.0
+        return max(0.0, anchor + (current - reference))
+    return max(0.0, 6.0 + 2.0 * (current - warning) / (danger - warning))
+
+def state_river_levels(stations):
+    """Highest river stage per state from CWC station records."""
+    levels = {}
+    for station in stations or []:
+        stage = river_stage(station)
+        if stage is not None and station.get("state"):
+            levels[station["state"]] = max(levels.get(station["state"], 0.0), round(stage, 2))
+    return levels
+
+class FeatureTable:
+    """Columnar per-state feature matrix (rows = states, columns = FEATURE_COLUMNS)."""
+    def __init__(self, states, values, live, built_at=None):
+        self.states = list(states)
+        self.values = np.asarray(values, dtype=np.float64).reshape(len(self.states), len(FEATURE_COLUMNS))
+        # True where a value came from live collector data rather than the baseline profile
+        self.live = np.asarray(live, dtype=bool).reshape(self.values.shape)
+        self.built_at = built_at or time.time()
+        self.index = {state: i for i, state in enumerate(self.states)}
+        self.version = hashlib.sha1(
+            "|".join(self.states).encode() + self.values.tobytes()
+        ).hexdigest()[:16]
+
+    def rows(self, state_names):
+        """Feature matrix for the given states; unknown states get the default profile."""
+        out = np.empty((len(state_names), len(FEATURE_COLUMNS)), dtype=np.float64)
+        for i, name in enumerate(state_names):
+            row = self.index.get(name)
+            out[i] = self.values[row] if row is not None else DEFAULT_PROFILE
+        return out
+
+class FeatureStore:
+    """
+    Aggregates live collector output into a per-state FeatureTable after each sync
+    and persists it as a .npz file so every API worker reads the same table.
+    """
+    def __init__(self, path="data/features.npz"):
+        self.path = path
+        self._table = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def build(self, state_weather, alerts, river_levels=None):
+        """
+        state_weather: iterable of (state, weather dict) from WeatherCollector
+        alerts: GDACS alert dicts tagged with metadata.state
+        river_levels: optional {state: level in metres}
+        """
+        sums = {}
+        for state, w in state_weather:
+            if not w:
+                continue
+            acc = sums.setdefault(state, {"rain": [], "soil": []})
+            if w.get("precip_24h_mm") is not None:
+                acc["rain"].append(w["precip_24h_mm"])
+            if w.get("soil_moisture") is not None:
+                # Open-Meteo reports m³/m³, the model was trained on percent
+                acc["soil"].append(w["soil_moisture"] * 100)
+
+        quakes = {}
+        for alert in alerts or []:
+            meta = alert.get("metadata", {})
+            if alert.get("event_type") == "EQ" and meta.get("state") and meta.get("magnitude") is not None:
+                quakes[meta["state"]] = max(quakes.get(meta["state"], 0), float(meta["magnitude"]))
+
+        river_levels = river_levels or {}
+        states = list(STATE_PROFILES) + sorted((set(sums) | set(quakes) | set(river_levels)) - set(STATE_PROFILES))
+        values = np.array([STATE_PROFILES.get(s, DEFAULT_PROFILE) for s in states], dtype=np.float64)
+        live = np.zeros(values.shape, dtype=bool)
+        for i, state in enumerate(states):
+            acc = sums.get(state, {})
+            if acc.get("rain"):
+                values[i, 0], live[i, 0] = np.mean(acc["rain"]), True
+            if state in quakes:
+                values[i, 1], live[i, 1] = quakes[state], True
+            if acc.get("soil"):
+                values[i, 2], live[i, 2] = np.mean(acc["soil"]), True
+            if state in river_levels:
+                values[i, 3], live[i, 3] = river_levels[state], True
+
+        table = FeatureTable(states, values, live)
+        self._save(table)
+        logger.info(f"Feature table {table.version}: {len(states)} states, {int(live.sum())} live values")
+        return table
+
+    def _save(self, table):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp.npz"
+        np.savez(tmp_path, states=np.array(table.states), values=table.values, live=table.live,
+                 built_at=np.array(table.built_at))
+        os.replace(tmp_path, self.path)
+        with self._lock:
+            self._table = table
+            self._mtime = os.path.getmtime(self.path)
+
+    def current(self):
+        """Latest table, reloaded when another process has written a newer file. None if never built."""
+        with self._lock:
+            if not os.path.exists(self.path):
+                return self._table
+            mtime = os.path.getmtime(self.path)
+            if self._table is None or mtime != self._mtime:
+                try:
+                    with np.load(self.path) as data:
+                        self._table = FeatureTable(data["states"].tolist(), data["values"], data["live"],
+                                                   float(data["built_at"]))
+                    self._mtime = mtime
+                except Exception as e:
+                    logger.error(f"Failed to load feature table {self.path}: {e}")
+            return self._table
@@ -0,0 +1,114 @@
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict
+from metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+class _Pending:
+    """An upstream call in flight that other requests for the same key wait on."""
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+class GeoCache:
+    """
+    TTL + LRU cache for coordinate based upstream lookups.
+    Coordinates are snapped to a grid of `grid_deg` degrees so nearby requests share an entry,
+    and concurrent misses for the same key are coalesced into a single upstream call.
+    """
+    def __init__(self, grid_deg=0.01, ttls=None, max_bytes=64 * 1024 * 1024, default_ttl=300):
+        self.grid_deg = grid_deg
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # key -> (expires_at, size, value)
+        self._pending = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    def snap(self, lat, lon):
+        """Returns the grid cell centre for a coordinate."""
+        g = self.grid_deg
+        return round(round(lat / g) * g, 6), round(round(lon / g) * g, 6)
+
+    def key(self, source, lat, lon, *extra):
+        return (source,) + self.snap(lat, lon) + tuple(extra)
+
+    def get_or_fetch(self, source, lat, lon, fetch, *extra):
+        """
+        Returns the cached value for (source, snapped lat/lon, *extra), calling
+        fetch(snapped_lat, snapped_lon) on a miss. None results are not cached.
+        """
+        key = self.key(source, lat, lon, *extra)
+        leader = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                CACHE_LOOKUPS.labels(f"geo_{source}", "hit").inc()
+                return entry[2]
+
+            pending = self._pending.get(key)
+            if pending:
+                self.stats["coalesced"] += 1
+                CACHE_LOOKUPS.labels(f"geo_{source}", "coalesced").inc()
+            else:
+                self.stats["misses"] += 1
+                CACHE_LOOKUPS.labels(f"geo_{source}", "miss").inc()
+                pending = _Pending()
+                self._pending[key] = pending
+                leader = True
+        if not leader:
+            pending.event.wait()
+            if pending.error:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = fetch(key[1], key[2])
+            if pending.value is not None:
+                self._store(key, pending.value, self.ttls.get(source, self.default_ttl))
+            return pending.value
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.event.set()
+
+    def _store(self, key, value, ttl):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= old[1]
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_ratio": round((self.stats["hits"] + self.stats["coalesced"]) / lookups, 4) if lookups else 0.0
+            }
@@ -1,13 +1,26 @@
-from fastapi import FastAPI, BackgroundTasks, Query
+from fastapi import FastAPI, BackgroundTasks, Query, Request
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from collectors.gdacs_collector import GDACSCollector
 from collectors.osm_collector import OSMCollector
+from collectors.osm_index import InfrastructureIndex
+from collectors.india_regions import RegionIndex
 from collectors.weather_collector import WeatherCollector
-from prediction_engine import DisasterPredictor
+from collectors.cwc_collector import CWCCollector
+from collection_engine import CollectionEngine
+from geo_cache import GeoCache
+from data_store import DataStore
+from precomputed import PrecomputedResponse
+from event_stream import DeltaBroadcaster
+from feature_store import FeatureStore, STATE_MONITORING_POINTS, state_river_levels
+from metrics import (CYCLE_SECONDS, DATA_AGE, REQUEST_SECONDS, CACHE_HIT_RATIO,
+                     generate_latest, CONTENT_TYPE_LATEST)
+from functools import partial
 import os
-import json
 import logging
+import threading
+import time
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
@@ -15,17 +28,43 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Antigravity Nexus - Real-Time Command Center")
 
-# Initialize ML Engine
-ml_engine = DisasterPredictor()
+# ML Engine, loaded on first use from the artifact written by `python prediction_engine.py train`.
+# prediction_engine (pandas, scikit-learn) is imported there too, so replicas that only
+# serve /api/data never load the ML stack.
+ml_engine = None
+ml_engine_lock = threading.Lock()
+
+def get_ml_engine():
+    global ml_engine
+    if ml_engine is None:
+        with ml_engine_lock:
+            if ml_engine is None:
+                from prediction_engine import DisasterPredictor
+                predictor = DisasterPredictor.load()
+                if predictor is None:
+                    logger.warning("No saved DisasterPredictor artifact found, training in-process")
+                    predictor = DisasterPredictor()
+                ml_engine = predictor
+    return ml_engine
+
+ML_STATES = ["Tamil Nadu", "Assam", "Uttarakhand", "Gujarat", "Maharashtra", "Kerala", "Delhi", "Odisha"]
+
+# ((model version, feature table version), PrecomputedResponse) for /api/ml-prediction
+ml_response = None
+
+def get_ml_response():
+    """Serialized predictions, rebuilt only when the model or the feature table changes."""
+    global ml_response
+    predictor = get_ml_engine()
+    table = feature_store.current()
+    key = (predictor.version or id(predictor), table.version if table is not None else None)
+    if ml_response is None or ml_response[0] != key:
+        ml_response = (key, PrecomputedResponse(predictor.predict_states(ML_STATES, table)))
+    return ml_response[1]
 
 @app.get("/api/ml-prediction")
-def get_ml_predictions():
-    states = ["Tamil Nadu", "Assam", "Uttarakhand", "Gujarat", "Maharashtra", "Kerala", "Delhi", "Odisha"]
-    results = []
-    for state in states:
-        pred = ml_engine.predict_state_risk(state)
-        results.append(pred)
-    return results
+def get_ml_predictions(request: Request):
+    return get_ml_response().serve(request)
 
 # CORS
 app.add_middleware(
@@ -36,51 +75,188 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.monotonic()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep the series count bounded
+        route = request.scope.get("route")
+        REQUEST_SECONDS.labels(request.method, getattr(route, "path", "unmatched"), str(status)).observe(
+            time.monotonic() - started)
+
+# Content-addressed image sets (tiles, thumbnails) never change once written
+IMMUTABLE_ASSET_PREFIX = "/assets/images/satellite/"
+
+@app.middleware("http")
+async def immutable_asset_headers(request: Request, call_next):
+    response = await call_next(request)
+    if request.url.path.startswith(IMMUTABLE_ASSET_PREFIX) and response.status_code == 200:
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
 # Static mounts
 os.makedirs("assets/images", exist_ok=True)
 app.mount("/assets", StaticFiles(directory="assets"), name="assets")
 
+# State/district boundaries for exact India filtering (assets/geo/*.geojson, optional)
+regions = RegionIndex()
+regions.load()
+
 # Initialize Real-Time Collectors
-gdacs = GDACSCollector()
-osm = OSMCollector()
+gdacs = GDACSCollector(regions=regions)
+# Local infrastructure index (built with `python -m collectors.osm_index build`); falls back to live Overpass
+osm_index = InfrastructureIndex()
+osm_index.load()
+osm = OSMCollector(index=osm_index)
 weather = WeatherCollector()
+# Flood bulletin station tables (river levels); page images only when no table can be parsed
+cwc = CWCCollector()
+# Per-source limits stop one hung upstream from holding the cycle to the full deadline
+engine = CollectionEngine(max_workers=16, deadline=60, source_timeouts={"gdacs": 45, "weather": 30})
+# ~1 km grid; weather changes on the Open-Meteo 15 min cadence, infrastructure rarely
+geo_cache = GeoCache(grid_deg=0.01, ttls={"weather": 600, "osm": 6 * 3600}, max_bytes=64 * 1024 * 1024)
+CACHE_HIT_RATIO.labels("geo").set_function(lambda: geo_cache.get_stats()["hit_ratio"])
+
+# Cities pre-fetched on every sync. All of them are fetched concurrently,
+# so adding entries here does not stretch the cycle.
+MAJOR_CITIES = {
+    "Delhi": (28.61, 77.20),
+    "Mumbai": (19.07, 72.87),
+    "Chennai": (13.08, 80.27),
+    "Kolkata": (22.57, 88.36),
+    "Guwahati": (26.11, 91.70) # North East focus
+}
 
+# Legacy whole-file store, only read once to seed the SQLite store
 DATA_FILE = "assets/data_store.json"
+store = DataStore("data/nexus.db")
+store.import_json(DATA_FILE)
 
 def save_data(data):
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    store.save(data)
 
 def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+    return store.latest()
+
+def data_age():
+    last_updated = (load_data() or {}).get("last_updated")
+    return time.time() - last_updated if last_updated else float("nan")
+
+DATA_AGE.set_function(data_age)
+
+# SSE deltas are diffed from the shared store, so clients on any worker receive them
+broadcaster = DeltaBroadcaster(store)
+# Per-state features for the predictor, rebuilt from live data after every sync
+feature_store = FeatureStore("data/features.npz")
+
+# (snapshot, PrecomputedResponse) for /api/data; rebuilt only when the store hands back a new snapshot
+data_response = None
+
+def get_data_response():
+    global data_response
+    data = load_data()
+    if data_response is None or data_response[0] is not data:
+        data_response = (data, PrecomputedResponse(data))
+    return data_response[1]
+
+def warm_up():
+    """Loads the ML stack and renders the prediction response ahead of the first request."""
+    started = time.monotonic()
+    try:
+        get_ml_response()
+        logger.info(f"ML warm-up finished in {time.monotonic() - started:.2f}s")
+    except Exception as e:
+        logger.error(f"ML warm-up failed: {e}")
+
+# NEXUS_WARMUP=1 loads the model in the background right after startup, so the API
+# is up immediately and the first /api/ml-prediction does not pay the import cost.
+# Not in __mp_main__: PDF render workers re-import this module when started with `python main.py`
+if os.environ.get("NEXUS_WARMUP") == "1" and __name__ != "__mp_main__":
+    threading.Thread(target=warm_up, name="ml-warmup", daemon=True).start()
+
+# /collect and the scheduler can both start a cycle; collectors keep per-instance state
+# (GDACS episode index, bulletin downloads), so only one cycle runs at a time
+collection_lock = threading.Lock()
 
 def run_collection_task():
+    if not collection_lock.acquire(blocking=False):
+        logger.info("Collection already running, skipping this trigger")
+        return
+    try:
+        with CYCLE_SECONDS.time():
+            _run_collection()
+    finally:
+        collection_lock.release()
+
+def _run_collection():
     logger.info("Starting global data collection...")
-    # Fetch Macro Data (Alerts)
-    alerts = gdacs.fetch_data()
-    
-    # We can pre-fetch some major city weather
-    major_cities = {
-        "Delhi": (28.61, 77.20),
-        "Mumbai": (19.07, 72.87),
-        "Chennai": (13.08, 80.27),
-        "Kolkata": (22.57, 88.36),
-        "Guwahati": (26.11, 91.70) # North East focus
-    }
-    
+    jobs = {"gdacs": gdacs.fetch_data, "cwc": cwc.fetch_data}
+    # City weather for the dashboard plus state sampling points for the feature table,
+    # packed into one Open-Meteo request per chunk; chunks still run concurrently
+    points = [("city", name, coords) for name, coords in MAJOR_CITIES.items()]
+    points += [("state", state, coords) for state, coords_list in STATE_MONITORING_POINTS.items() for coords in coords_list]
+    chunks = {}
+    for start in range(0, len(points), weather.max_batch_size):
+        chunk = points[start:start + weather.max_batch_size]
+        key = f"weather:{start // weather.max_batch_size}"
+        chunks[key] = chunk
+        jobs[key] = partial(weather.fetch_weather_batch, [coords for _, _, coords in chunk])
+
+    fetched, failures = engine.run(jobs)
+
+    # Sources that missed the deadline or failed upstream keep their previous value instead of blanking the dashboard
+    previous = load_data()
+    alerts = fetched.get("gdacs")
+    if alerts is None:
+        failures.setdefault("gdacs", "unavailable")
+        alerts = previous.get("alerts", [])
+    flood_report = fetched.get("cwc")
+    if not flood_report or "error" in flood_report:
+        if flood_report:
+            failures["cwc"] = flood_report["error"]
+        flood_report = previous.get("cwc")
+
     city_weather = {}
-    for name, coords in major_cities.items():
-        city_weather[name] = weather.fetch_weather(coords[0], coords[1])
+    state_weather = []
+    previous_weather = previous.get("key_metrics", {})
+    for key, chunk in chunks.items():
+        # A timed-out chunk and a failed request (None entries) are handled the same way
+        batch = fetched.get(key) or [None] * len(chunk)
+        if None in batch:
+            failures.setdefault(key, "unavailable")
+        for (kind, name, _), data in zip(chunk, batch):
+            if kind == "city":
+                if data is not None:
+                    city_weather[name] = data
+                elif name in previous_weather:
+                    city_weather[name] = previous_weather[name]
+            elif data is not None:
+                state_weather.append((name, data))
+
+    feature_store.build(state_weather, alerts,
+                        river_levels=state_river_levels((flood_report or {}).get("stations")))
 
     results = {
         "alerts": alerts,
         "key_metrics": city_weather,
-        "last_updated": os.path.getmtime(DATA_FILE) if os.path.exists(DATA_FILE) else 0
+        "cwc": flood_report,
+        "stale_sources": sorted(failures),
+        "last_updated": time.time()
     }
     save_data(results)
+    # Serialize and compress once here rather than on the first poll
+    get_data_response()
+    broadcaster.notify()
+    # A broken or missing model must not cost the cycle its data or its stream update
+    try:
+        get_ml_response()
+    except Exception as e:
+        logger.error(f"ML prediction precompute failed: {e}")
     logger.info("Global data collection complete.")
 
 @app.get("/")
@@ -93,18 +269,51 @@ async def trigger_collection(background_tasks: BackgroundTasks):
     return {"message": "Global collection triggered"}
 
 @app.get("/api/data")
-def get_global_data():
-    return load_data()
+def get_global_data(request: Request):
+    return get_data_response().serve(request)
+
+@app.get("/api/stream")
+async def stream_updates(request: Request, last_event_id: str = None):
+    """
+    Server-Sent Events feed of collection deltas. Reconnecting EventSource clients send
+    Last-Event-ID automatically and only receive what they missed.
+    """
+    token = request.headers.get("last-event-id") or last_event_id
+    return StreamingResponse(
+        broadcaster.stream(request, token),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/alerts/history")
+def get_alert_history(since: float = None, limit: int = 500):
+    """Alerts seen across past cycles, most recently seen first"""
+    return store.alert_history(since, limit)
 
 @app.get("/api/infrastructure")
-def get_nearby_infrastructure(lat: float, lon: float, radius: int = 5000):
-    """Real-time fetch of hospitals/police from OSM"""
-    return osm.fetch_infrastructure(lat, lon, radius)
+def get_nearby_infrastructure(lat: float = Query(..., ge=-90, le=90), lon: float = Query(..., ge=-180, le=180),
+                              radius: int = Query(5000, gt=0, le=50000)):
+    """Real-time fetch of hospitals/police from OSM (cached per grid cell and radius)"""
+    # Failed lookups come back as None and are not cached; the client still gets a list
+    return geo_cache.get_or_fetch("osm", lat, lon, lambda la, lo: osm.fetch_infrastructure(la, lo, radius), radius) or []
+
+@app.get("/api/infrastructure/nearest")
+def get_nearest_infrastructure(lat: float, lon: float, k: int = 10):
+    """k nearest hospitals/police/fire stations from the local OSM index"""
+    return osm.nearest_infrastructure(lat, lon, k)
 
 @app.get("/api/weather")
 def get_local_weather(lat: float, lon: float):
-    """Real-time fetch of weather from OpenMeteo"""
-    return weather.fetch_weather(lat, lon)
+    """Real-time fetch of weather from OpenMeteo (cached per grid cell)"""
+    return geo_cache.get_or_fetch("weather", lat, lon, weather.fetch_weather)
+
+@app.get("/api/cache/stats")
+def get_cache_stats():
+    return geo_cache.get_stats()
+
+@app.get("/metrics")
+def get_metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 if __name__ == "__main__":
     import uvicorn
@@ -113,6 +322,8 @@ if __name__ == "__main__":
     # Initialize Scheduler
     scheduler = BackgroundScheduler()
     scheduler.add_job(run_collection_task, 'interval', minutes=15)
+    if osm_index.loaded:
+        scheduler.add_job(osm_index.refresh, 'interval', hours=24)
     scheduler.start()
     print("Auto-Sync Scheduler Started: Running every 15 minutes.")
 
@@ -123,4 +334,5 @@ if __name__ == "__main__":
         uvicorn.run(app, host="0.0.0.0", port=8000)
     except (KeyboardInterrupt, SystemExit):
         scheduler.shutdown()
+        engine.shutdown()
 
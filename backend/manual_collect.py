@@ -1,6 +1,5 @@
 import os
 import sys
-import json
 import time
 
 # Add backend to path
@@ -9,6 +8,7 @@ sys.path.append(os.getcwd())
 from collectors.imd_collector import IMDCollector
 from collectors.cwc_collector import CWCCollector
 from collectors.isro_collector import ISROCollector
+from data_store import DataStore
 # from collectors.safar_collector import SAFARCollector
 
 def run_manual():
@@ -43,8 +43,7 @@ def run_manual():
     }
     
     print("Saving Data...")
-    with open("assets/data_store.json", 'w') as f:
-        json.dump(results, f, indent=2)
+    DataStore("data/nexus.db").save(results)
     
     print("Done.")
 
@@ -0,0 +1,95 @@
+import contextlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Prometheus instrumentation shared by the API, the collectors and the models.
+# Without prometheus_client every metric is a no-op and /metrics is empty.
+try:
+    from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+except ImportError:
+    logger.warning("prometheus_client not installed, metrics are disabled")
+
+    class _NoopMetric:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def labels(self, *args, **kwargs):
+            return self
+
+        def inc(self, amount=1):
+            pass
+
+        def observe(self, value):
+            pass
+
+        def set(self, value):
+            pass
+
+        def set_function(self, fn):
+            pass
+
+        def time(self):
+            return contextlib.nullcontext()
+
+    Counter = Gauge = Histogram = _NoopMetric
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+    def generate_latest(registry=None):
+        return b""
+
+# --- Upstreams and collectors ---
+
+UPSTREAM_SECONDS = Histogram(
+    "nexus_upstream_request_seconds", "Latency of each HTTP attempt to an upstream",
+    ["host", "status"], buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+)
+CIRCUIT_OPEN = Counter(
+    "nexus_upstream_circuit_open_total", "Requests refused because the upstream's circuit was open", ["host"]
+)
+COLLECTOR_SECONDS = Histogram(
+    "nexus_collector_seconds", "Wall time of one collector job in a sync",
+    ["collector", "outcome"], buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+)
+COLLECTOR_TIMEOUTS = Counter(
+    "nexus_collector_timeouts_total", "Collector jobs dropped at the sync deadline", ["collector"]
+)
+CYCLE_SECONDS = Histogram(
+    "nexus_collection_cycle_seconds", "Duration of a full collection cycle",
+    buckets=(1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 300)
+)
+DATA_AGE = Gauge(
+    "nexus_data_age_seconds", "Seconds since the stored snapshot was last updated"
+)
+
+# --- API ---
+
+REQUEST_SECONDS = Histogram(
+    "nexus_http_request_seconds", "FastAPI request latency per route template",
+    ["method", "route", "status"]
+)
+
+# --- Bulletins and models ---
+
+PDF_RENDER_SECONDS = Histogram(
+    "nexus_pdf_render_seconds", "Time to rasterize all pages of a bulletin",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+)
+PDF_PAGES_RENDERED = Counter("nexus_pdf_pages_rendered_total", "Bulletin pages rasterized")
+BULLETIN_PARSE_SECONDS = Histogram(
+    "nexus_bulletin_parse_seconds", "Time to extract structured records from a bulletin",
+    ["source"], buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+INFERENCE_SECONDS = Histogram(
+    "nexus_model_inference_seconds", "Time of one batched model inference call",
+    ["model"], buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+# --- Caches ---
+
+CACHE_LOOKUPS = Counter(
+    "nexus_cache_lookups_total", "Cache lookups by cache and result (hit, miss, coalesced)", ["cache", "result"]
+)
+CACHE_HIT_RATIO = Gauge(
+    "nexus_cache_hit_ratio", "Hit ratio since process start", ["cache"]
+)
@@ -0,0 +1,200 @@
+import os
+import json
+import glob
+import logging
+from datetime import datetime
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Parquet support comes from pyarrow; without it the caller falls back to a full stream
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+class FirestoreIngestor:
+    """
+    Incremental Firestore -> Parquet mirror for training data.
+
+    Each collection is read in `page_size` pages with a query cursor. After the first
+    full scan only documents whose `watermark_field` is at or after the stored
+    watermark are fetched. Every sync appends one or more Parquet part files under
+    `cache_dir/<collection>/`; `load()` reads the parts and keeps the newest copy of
+    each document, so a run only pays for the documents that changed.
+
+    Deletions are not visible through the watermark; `sync(name, full=True)`
+    rebuilds a collection from scratch.
+    """
+    def __init__(self, db, cache_dir="data/firestore_cache", page_size=500,
+                 watermark_field="updated_at", part_rows=50000, max_parts=32):
+        if pq is None:
+            raise RuntimeError("The Firestore cache requires the 'pyarrow' package")
+        self.db = db
+        self.cache_dir = cache_dir
+        self.page_size = page_size
+        self.watermark_field = watermark_field
+        self.part_rows = part_rows
+        self.max_parts = max_parts
+        self.state_path = os.path.join(cache_dir, "state.json")
+        self._state = self._load_state()
+
+    # --- State ---
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, "r") as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.error(f"Firestore cache: state unreadable, starting fresh - {e}")
+        return {}
+
+    def _save_state(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def watermark(self, name):
+        entry = self._state.get(name, {}).get("watermark")
+        if entry is None:
+            return None
+        if entry["type"] == "datetime":
+            return datetime.fromisoformat(entry["value"])
+        return entry["value"]
+
+    def _set_watermark(self, name, value):
+        if isinstance(value, datetime):
+            entry = {"type": "datetime", "value": value.isoformat()}
+        else:
+            entry = {"type": type(value).__name__, "value": value}
+        self._state.setdefault(name, {})["watermark"] = entry
+
+    # --- Fetching ---
+
+    def _pages(self, name, since):
+        """Yields lists of document snapshots, page by page, using start_after cursors."""
+        base = self.db.collection(name)
+        if since is None:
+            # Full scan ordered by document id also picks up documents without a watermark field
+            base = base.order_by("__name__")
+        else:
+            base = base.where(self.watermark_field, ">=", since).order_by(self.watermark_field)
+        last = None
+        while True:
+            query = base.limit(self.page_size)
+            if last is not None:
+                query = query.start_after(last)
+            page = list(query.stream())
+            if page:
+                yield page
+            if len(page) < self.page_size:
+                return
+            last = page[-1]
+
+    @staticmethod
+    def _normalize(value):
+        """Converts Firestore types that Parquet cannot hold into plain values."""
+        if isinstance(value, dict):
+            return {k: FirestoreIngestor._normalize(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [FirestoreIngestor._normalize(v) for v in value]
+        if hasattr(value, "latitude") and hasattr(value, "longitude"):
+            return {"lat": value.latitude, "lng": value.longitude} # GeoPoint
+        if hasattr(value, "path") and hasattr(value, "id"):
+            return value.path # DocumentReference
+        return value
+
+    def _to_frame(self, rows):
+        df = pd.DataFrame(rows)
+        for col in df.columns:
+            if df[col].dtype != object:
+                continue
+            kinds = {type(v) for v in df[col].dropna()}
+            # Parquet needs one type per column; mixed columns are stored as text
+            if len(kinds) > 1 and not kinds <= {int, float}:
+                df[col] = df[col].map(lambda v: v if v is None or isinstance(v, str) else json.dumps(v, default=str))
+        return df
+
+    def _write_part(self, name, rows):
+        folder = os.path.join(self.cache_dir, name)
+        os.makedirs(folder, exist_ok=True)
+        entry = self._state.setdefault(name, {})
+        seq = entry.get("next_part", 0)
+        path = os.path.join(folder, f"part-{seq:06d}.parquet")
+        tmp_path = path + ".tmp"
+        self._to_frame(rows).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        entry["next_part"] = seq + 1
+        return path
+
+    def _parts(self, name):
+        return sorted(glob.glob(os.path.join(self.cache_dir, name, "part-*.parquet")))
+
+    def sync(self, name, full=False):
+        """Fetches new and changed documents of a collection into the cache. Returns the count."""
+        if full:
+            for path in self._parts(name):
+                os.remove(path)
+            self._state.pop(name, None)
+
+        since = self.watermark(name)
+        newest = since
+        rows, fetched = [], 0
+        for page in self._pages(name, since):
+            for doc in page:
+                d = self._normalize(doc.to_dict() or {})
+                d["doc_id"] = doc.id
+                rows.append(d)
+                mark = d.get(self.watermark_field)
+                if mark is not None and (newest is None or mark > newest):
+                    newest = mark
+            fetched += len(page)
+            if len(rows) >= self.part_rows:
+                self._write_part(name, rows)
+                rows = []
+        if rows:
+            self._write_part(name, rows)
+
+        if newest is not None:
+            self._set_watermark(name, newest)
+        self._state.setdefault(name, {})["synced_at"] = datetime.now().isoformat()
+        self._save_state()
+        if len(self._parts(name)) > self.max_parts:
+            self.compact(name)
+        logger.info(f"Firestore cache: {name} synced {fetched} documents (watermark {newest})")
+        return fetched
+
+    # --- Reading ---
+
+    def load(self, name, columns=None):
+        """Reads the cached collection, newest version of each document only."""
+        parts = self._parts(name)
+        if not parts:
+            return pd.DataFrame()
+        if columns is not None:
+            columns = list(dict.fromkeys(list(columns) + ["doc_id"]))
+        frames = []
+        for path in parts:
+            if columns is None:
+                frames.append(pd.read_parquet(path))
+            else:
+                # Only read the requested columns that this part actually has
+                present = [c for c in columns if c in pq.read_schema(path).names]
+                frames.append(pd.read_parquet(path, columns=present).reindex(columns=columns))
+        df = pd.concat(frames, ignore_index=True)
+        return df.drop_duplicates(subset="doc_id", keep="last").reset_index(drop=True)
+
+    def compact(self, name):
+        """Rewrites all parts of a collection into a single deduplicated part."""
+        old_parts = self._parts(name)
+        if len(old_parts) < 2:
+            return
+        df = self.load(name)
+        self._write_part(name, df.to_dict("records"))
+        for path in old_parts:
+            os.remove(path)
+        self._save_state()
+        logger.info(f"Firestore cache: compacted {name} from {len(old_parts)} parts")
@@ -1,27 +1,49 @@
 import os
 import json
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler, LabelEncoder
 from sklearn.model_selection import train_test_split
-import tensorflow as tf
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense, Dropout, Bidirectional
-from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
 import joblib
 from datetime import datetime, timedelta
+from metrics import INFERENCE_SECONDS
+
+# Per-step inputs of the sequence model; risk_score last, it is also the target
+SEQUENCE_FEATURES = ['lat','lng','hour','day_of_week','day_of_month','month','risk_score']
+
+# TensorFlow takes seconds to import and is only needed to build, train or run the
+# network; data fetching, preprocessing and sequence building work without it
+tf = None
+
+def _tensorflow():
+    global tf
+    if tf is None:
+        import tensorflow
+        tf = tensorflow
+    return tf
 
 class TouristSafetyLSTM:
     """LSTM Model for predicting tourist safety metrics"""
-    def __init__(self, firebase_credentials_path=None):
+    def __init__(self, firebase_credentials_path=None, cache_dir=None):
         self.db = None
         if firebase_credentials_path:
             self._initialize_firebase(firebase_credentials_path)
+        # Optional local Parquet mirror of the training collections, synced incrementally
+        self.ingestor = None
+        if cache_dir:
+            try:
+                from .firestore_ingest import FirestoreIngestor
+                self.ingestor = FirestoreIngestor(self.db, cache_dir=cache_dir)
+            except Exception as e:
+                print(f"Firestore cache disabled: {e}")
         self.model = None
         self.scaler = MinMaxScaler()
         self.label_encoder = LabelEncoder()
         self.sequence_length = 24
         self.feature_columns = []
+        self._infer = None
+        self._infer_model = None
 
     def _initialize_firebase(self, credentials_path):
         try:
@@ -35,6 +57,16 @@ class TouristSafetyLSTM:
             self.db = None
 
     def fetch_training_data(self):
+        if self.ingestor:
+            data = {}
+            for name in ('tourists', 'alerts', 'zones'):
+                if self.db:
+                    try:
+                        self.ingestor.sync(name)
+                    except Exception as e:
+                        print(f"Firestore sync failed for {name}, using cached data: {e}")
+                data[name] = self.ingestor.load(name)
+            return data
         if not self.db:
             print("No Firebase DB, returning empty data frames.")
             return {
@@ -100,25 +132,60 @@ class TouristSafetyLSTM:
         tourists_df['risk_score'] = tourists_df['risk_score'].fillna(0)
         return tourists_df, alerts_df
 
-    def _calculate_location_risk(self, tourists_df, alerts_df):
+    def _calculate_location_risk(self, tourists_df, alerts_df, window=0.01, chunk_size=500000):
         if alerts_df.empty:
             return pd.DataFrame({'lat':tourists_df['lat'].unique(),'lng':tourists_df['lng'].unique(),'risk_score':[0.0]*len(tourists_df['lat'].unique())})
         alerts_df['alert_lat'] = alerts_df['location'].apply(lambda x: x.get('lat',0) if isinstance(x, dict) else 0)
         alerts_df['alert_lng'] = alerts_df['location'].apply(lambda x: x.get('lng',0) if isinstance(x, dict) else 0)
-        rows = []
-        for _, row in tourists_df.iterrows():
-            lat, lng = row['lat'], row['lng']
-            if lat==0 and lng==0:
-                rows.append({'lat':lat,'lng':lng,'risk_score':0.0}); continue
-            nearby = alerts_df[(abs(alerts_df['alert_lat']-lat)<0.01)&(abs(alerts_df['alert_lng']-lng)<0.01]
-            risk = len(nearby)*0.1
-            if not nearby.empty and 'priority_encoded' in nearby.columns:
-                risk += nearby['priority_encoded'].mean()*0.3
-            rows.append({'lat':lat,'lng':lng,'risk_score':min(risk,1.0)})
-        return pd.DataFrame(rows).drop_duplicates()
+        locations = tourists_df[['lat','lng']].drop_duplicates().reset_index(drop=True)
+        t_lat = locations['lat'].to_numpy(dtype=float)
+        t_lng = locations['lng'].to_numpy(dtype=float)
+        a_lat = alerts_df['alert_lat'].to_numpy(dtype=float)
+        a_lng = alerts_df['alert_lng'].to_numpy(dtype=float)
+        has_priority = 'priority_encoded' in alerts_df.columns
+        a_prio = alerts_df['priority_encoded'].to_numpy(dtype=float) if has_priority else np.zeros(len(a_lat))
 
-    def create_sequences(self, df, target='risk_score'):
-        self.feature_columns = ['lat','lng','hour','day_of_week','day_of_month','month','risk_score']
+        # Grid hash with window-sized cells: every alert within the +-window box of a
+        # location lies in the 3x3 block of cells around it
+        def cell_key(row, col):
+            return (row + 2**20) * 2**21 + (col + 2**20)
+        a_keys = cell_key(np.floor(a_lat / window).astype(np.int64), np.floor(a_lng / window).astype(np.int64))
+        order = np.argsort(a_keys, kind='stable')
+        sorted_keys = a_keys[order]
+
+        counts = np.zeros(len(t_lat))
+        priority_sum = np.zeros(len(t_lat))
+        # Chunked over locations so the candidate pair arrays stay bounded
+        for start in range(0, len(t_lat), chunk_size):
+            lat = t_lat[start:start+chunk_size]
+            lng = t_lng[start:start+chunk_size]
+            row = np.floor(lat / window).astype(np.int64)
+            col = np.floor(lng / window).astype(np.int64)
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    keys = cell_key(row + dr, col + dc)
+                    lo = np.searchsorted(sorted_keys, keys, side='left')
+                    n = np.searchsorted(sorted_keys, keys, side='right') - lo
+                    total = int(n.sum())
+                    if total == 0:
+                        continue
+                    # Expand every (location, candidate alert) pair in this cell
+                    t_idx = np.repeat(np.arange(len(lat)), n)
+                    a_idx = order[np.repeat(lo, n) + np.arange(total) - np.repeat(np.cumsum(n) - n, n)]
+                    hit = (np.abs(a_lat[a_idx] - lat[t_idx]) < window) & (np.abs(a_lng[a_idx] - lng[t_idx]) < window)
+                    counts[start:start+len(lat)] += np.bincount(t_idx[hit], minlength=len(lat))
+                    priority_sum[start:start+len(lat)] += np.bincount(t_idx[hit], weights=a_prio[a_idx[hit]], minlength=len(lat))
+
+        risk = counts * 0.1
+        if has_priority:
+            risk += np.divide(priority_sum, counts, out=np.zeros_like(priority_sum), where=counts > 0) * 0.3
+        risk = np.minimum(risk, 1.0)
+        risk[(t_lat == 0) & (t_lng == 0)] = 0.0
+        locations['risk_score'] = risk
+        return locations
+
+    def _scaled_features(self, df):
+        self.feature_columns = list(SEQUENCE_FEATURES)
         for col in self.feature_columns:
             if col not in df.columns:
                 df[col] = 0
@@ -130,46 +197,124 @@ class TouristSafetyLSTM:
         if len(features) < self.sequence_length + 1:
             self.sequence_length = max(1, len(features)//2)
         scaled = self.scaler.fit_transform(features)
-        X, y = [], []
-        for i in range(len(scaled)-self.sequence_length):
-            X.append(scaled[i:i+self.sequence_length])
-            y.append(scaled[i+self.sequence_length, -1])
-        if not X:
+        if len(scaled) <= self.sequence_length:
             raise ValueError('Not enough data to create sequences')
-        return np.array(X), np.array(y)
+        return scaled
+
+    def create_sequences(self, df, target='risk_score'):
+        """
+        Returns (X, y) with X of shape (n, sequence_length, features). X is a strided,
+        read-only view over the scaled feature matrix, not a copy per window. The saving
+        ends at model.fit, which converts X to a dense tensor (and validation_split slices
+        copies of it); large histories should go through create_sequence_datasets.
+        """
+        scaled = self._scaled_features(df)
+        # Window i covers rows i..i+sequence_length-1; its target is the next row's risk_score
+        windows = sliding_window_view(scaled, self.sequence_length, axis=0)[:-1]
+        X = windows.transpose(0, 2, 1)
+        y = scaled[self.sequence_length:, -1]
+        return X, y
+
+    def create_sequence_datasets(self, df, batch_size=32, val_split=0.2):
+        """
+        Lazy alternative to create_sequences for large histories: tf.data pipelines that
+        cut windows batch by batch, split chronologically into (train, validation).
+        """
+        tf = _tensorflow()
+        scaled = self._scaled_features(df).astype(np.float32)
+        data, targets = scaled[:-1], scaled[self.sequence_length:, -1]
+        n_sequences = len(targets)
+        split = int(n_sequences * (1 - val_split))
+        make = lambda start, end: tf.keras.utils.timeseries_dataset_from_array(
+            data, targets, sequence_length=self.sequence_length, batch_size=batch_size,
+            start_index=start, end_index=end
+        ).prefetch(tf.data.AUTOTUNE)
+        # end_index bounds the rows a window may use, so the last train window ends at split + sequence_length - 1
+        train_ds = make(0, split + self.sequence_length - 1)
+        val_ds = make(split, None) if split < n_sequences else None
+        return train_ds, val_ds
 
     def build_model(self, input_shape):
-        model = Sequential([
-            Bidirectional(LSTM(128, return_sequences=True), input_shape=input_shape),
-            Dropout(0.3),
-            Bidirectional(LSTM(64, return_sequences=True)),
-            Dropout(0.3),
-            LSTM(32),
-            Dropout(0.2),
-            Dense(16, activation='relu'),
-            Dense(1, activation='sigmoid')
+        tf = _tensorflow()
+        layers = tf.keras.layers
+        model = tf.keras.models.Sequential([
+            layers.Bidirectional(layers.LSTM(128, return_sequences=True), input_shape=input_shape),
+            layers.Dropout(0.3),
+            layers.Bidirectional(layers.LSTM(64, return_sequences=True)),
+            layers.Dropout(0.3),
+            layers.LSTM(32),
+            layers.Dropout(0.2),
+            layers.Dense(16, activation='relu'),
+            layers.Dense(1, activation='sigmoid')
         ])
         model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=0.001), loss='mse', metrics=['mae','mse'])
         return model
 
-    def train(self, epochs=30, batch_size=32, val_split=0.2):
+    def train(self, epochs=30, batch_size=32, val_split=0.2, streaming=None, max_dense_mb=256):
+        """
+        Trains the model. streaming=True feeds batches lazily through tf.data instead of
+        materializing every window; the default (None) streams whenever the dense window
+        tensor would exceed max_dense_mb.
+        """
         data = self.fetch_training_data()
         tourists_df, alerts_df = self.preprocess_data(data)
+        if streaming is None:
+            # float32 windows as Keras would materialize them
+            dense_bytes = len(tourists_df) * self.sequence_length * len(SEQUENCE_FEATURES) * 4
+            streaming = dense_bytes > max_dense_mb * 1024 * 1024
+        callbacks = _tensorflow().keras.callbacks
+        early = callbacks.EarlyStopping(monitor='val_loss', patience=5, restore_best_weights=True)
+        checkpoint = callbacks.ModelCheckpoint('models/best_lstm.h5', monitor='val_loss', save_best_only=True)
+        if streaming:
+            train_ds, val_ds = self.create_sequence_datasets(tourists_df, batch_size, val_split)
+            self.model = self.build_model((self.sequence_length, len(self.feature_columns)))
+            self.model.fit(train_ds, epochs=epochs, validation_data=val_ds, callbacks=[early, checkpoint])
+            return self.model
         X, y = self.create_sequences(tourists_df)
         self.model = self.build_model((X.shape[1], X.shape[2]))
-        early = EarlyStopping(monitor='val_loss', patience=5, restore_best_weights=True)
-        checkpoint = ModelCheckpoint('models/best_lstm.h5', monitor='val_loss', save_best_only=True)
         self.model.fit(X, y, epochs=epochs, batch_size=batch_size, validation_split=val_split, callbacks=[early, checkpoint])
         return self.model
 
     def predict_risk(self, tourist_data):
+        return self.predict_risk_batch([tourist_data])[0]
+
+    def _compiled_inference(self):
+        # Traced once per model with a dynamic batch dimension, so batch sizes do not retrace
+        if self._infer_model is not self.model:
+            tf = _tensorflow()
+            spec = tf.TensorSpec([None, self.sequence_length, len(self.feature_columns)], tf.float32)
+            self._infer = tf.function(lambda x: self.model(x, training=False), input_signature=[spec])
+            self._infer_model = self.model
+        return self._infer
+
+    def predict_risk_batch(self, tourists, histories=None, batch_size=1024):
+        """
+        Scores many tourists in one pass and returns a list of risk scores.
+        tourists: feature dicts with each tourist's current state.
+        histories: optional list aligned with tourists of recent feature dicts, oldest first.
+        The current state is the last time step; short histories are left-padded with
+        their oldest row, so a tourist without history gets the repeated current state.
+        """
         if self.model is None:
             raise RuntimeError('Model not trained')
-        feats = [tourist_data.get(col,0) for col in self.feature_columns]
-        seq = np.array([feats]*self.sequence_length)
-        seq_scaled = self.scaler.transform(seq).reshape(1, self.sequence_length, len(self.feature_columns))
-        pred = self.model.predict(seq_scaled, verbose=0)
-        return float(pred[0][0])
+        if not tourists:
+            return []
+        length, n_features = self.sequence_length, len(self.feature_columns)
+        x = np.empty((len(tourists), length, n_features), dtype=np.float32)
+        for i, tourist in enumerate(tourists):
+            history = list(histories[i] or []) if histories is not None else []
+            steps = history[-(length - 1):] + [tourist] if length > 1 else [tourist]
+            rows = [[step.get(col, 0) for col in self.feature_columns] for step in steps]
+            x[i, :length - len(rows)] = rows[0]
+            x[i, length - len(rows):] = rows
+        x = self.scaler.transform(x.reshape(-1, n_features)).astype(np.float32).reshape(x.shape)
+
+        infer = self._compiled_inference()
+        tf = _tensorflow()
+        with INFERENCE_SECONDS.labels("lstm").time():
+            scores = [infer(tf.constant(x[start:start + batch_size])).numpy().reshape(-1)
+                      for start in range(0, len(x), batch_size)]
+        return np.concatenate(scores).astype(float).tolist()
 
     def save_model(self, model_path='models/lstm_model.h5', scaler_path='models/scaler.pkl'):
         os.makedirs('models', exist_ok=True)
@@ -179,7 +324,7 @@ class TouristSafetyLSTM:
         print(f"Model saved to {model_path}")
 
     def load_model(self, model_path='models/lstm_model.h5', scaler_path='models/scaler.pkl'):
-        self.model = load_model(model_path)
+        self.model = _tensorflow().keras.models.load_model(model_path)
         self.scaler = joblib.load(scaler_path)
         self.feature_columns = joblib.load('models/feature_columns.pkl')
         print(f"Model loaded from {model_path}")
@@ -0,0 +1,58 @@
+import gzip
+import json
+import hashlib
+import logging
+from fastapi import Response
+
+logger = logging.getLogger(__name__)
+
+# Brotli is optional; without it clients fall back to gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+def accepted_encodings(header):
+    """Parses Accept-Encoding into {coding: q}; codings sent with q=0 map to 0."""
+    accepted = {}
+    for token in header.split(","):
+        coding, *params = [part.strip() for part in token.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+class PrecomputedResponse:
+    """
+    A JSON payload serialized and compressed once, served to every client as-is.
+    The ETag is a hash of the body so unchanged payloads get 304 Not Modified.
+    """
+    def __init__(self, data):
+        self.body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.gzip = gzip.compress(self.body, compresslevel=9)
+        self.br = brotli.compress(self.body, quality=11) if brotli else None
+
+    def serve(self, request, cache_control="no-cache"):
+        headers = {"ETag": self.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        wildcard = accepted.get("*", 0.0)
+        # Highest q wins; on a tie brotli is preferred for its smaller body
+        candidates = [(accepted.get(name, wildcard), name, body)
+                      for name, body in (("br", self.br), ("gzip", self.gzip)) if body is not None]
+        q, name, body = max(candidates, key=lambda c: c[0], default=(0.0, None, None))
+        if q > 0:
+            return Response(body, media_type="application/json", headers={**headers, "Content-Encoding": name})
+        return Response(self.body, media_type="application/json", headers=headers)
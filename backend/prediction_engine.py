@@ -1,80 +1,196 @@
+import os
+import sys
+import time
+import logging
+import joblib
+import hashlib
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 
+from feature_store import FEATURE_COLUMNS, STATE_PROFILES, DEFAULT_PROFILE
+from metrics import INFERENCE_SECONDS, CACHE_LOOKUPS
+
+DISASTER_TYPES = ["None", "Flood", "Landslide", "Earthquake"]
+
+MODEL_DIR = "models/disaster_predictor"
+
+logger = logging.getLogger(__name__)
+
 class DisasterPredictor:
-    def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=100)
+    def __init__(self, n_samples=1000, model=None, version=None, random_state=42):
         self.scaler = StandardScaler()
-        self._train_mock_model()
+        self.n_samples = n_samples
+        self.random_state = random_state
+        self.version = version
+        # (model version, state, feature hash) -> result dict; see predict_states
+        self._prediction_cache = {}
+        self.max_cached_predictions = 10000
+        if model is not None:
+            self.model = model
+        else:
+            self.model = RandomForestClassifier(n_estimators=100, n_jobs=-1, random_state=random_state)
+            self._train_mock_model()
+        # Fit on every core, but score single-threaded: batches are a few states, and a
+        # joblib fan-out per request in every API worker costs more than it saves
+        self.model.n_jobs = 1
+
+    def save(self, model_dir=MODEL_DIR):
+        """
+        Writes a new versioned artifact (v<N>.joblib) and points LATEST at it.
+        Saved uncompressed, which is the fastest format for joblib to load.
+        """
+        os.makedirs(model_dir, exist_ok=True)
+        existing = [int(f[1:-7]) for f in os.listdir(model_dir) if f.startswith("v") and f.endswith(".joblib")]
+        self.version = max(existing, default=0) + 1
+        path = os.path.join(model_dir, f"v{self.version}.joblib")
+        joblib.dump({
+            "version": self.version,
+            "trained_at": time.time(),
+            "n_samples": self.n_samples,
+            "features": FEATURE_COLUMNS,
+            "model": self.model
+        }, path)
+
+        tmp_pointer = os.path.join(model_dir, "LATEST.tmp")
+        with open(tmp_pointer, "w") as f:
+            f.write(str(self.version))
+        os.replace(tmp_pointer, os.path.join(model_dir, "LATEST"))
+        return path
+
+    @classmethod
+    def load(cls, model_dir=MODEL_DIR, version=None, mmap_mode=None):
+        """
+        Loads a saved artifact (LATEST unless a version is given).
+        Returns None when no artifact exists.
+
+        Every process that calls this holds its own copy of the forest: sklearn's Tree
+        copies its node and value arrays into private memory when unpickled, so
+        mmap_mode does not make workers share them. Workers only share the trees
+        copy-on-write when they are forked from a process that loaded the model first.
+        """
+        if version is None:
+            pointer = os.path.join(model_dir, "LATEST")
+            if not os.path.exists(pointer):
+                return None
+            with open(pointer) as f:
+                version = int(f.read().strip())
+        path = os.path.join(model_dir, f"v{version}.joblib")
+        if not os.path.exists(path):
+            return None
+        artifact = joblib.load(path, mmap_mode=mmap_mode)
+        if artifact.get("features") != FEATURE_COLUMNS:
+            logger.warning(f"Model artifact {path} has features {artifact.get('features')}, expected {FEATURE_COLUMNS}")
+            return None
+        logger.info(f"Loaded DisasterPredictor v{artifact['version']} from {path}")
+        return cls(n_samples=artifact.get("n_samples", 0), model=artifact["model"], version=artifact["version"])
+
+    @staticmethod
+    def label_samples(rainfall, seismic, soil_moisture, river_level):
+        """Logic-based labels, first matching rule wins: 3=Quake, 1=Flood, 2=Landslide, 0=Safe."""
+        return np.select(
+            [
+                seismic > 5.5,
+                (rainfall > 180) | (river_level > 8),
+                (rainfall > 150) & (soil_moisture > 70),
+            ],
+            [3, 1, 2],
+            default=0
+        )
 
     def _train_mock_model(self):
         # Simulated historical data for India (Features: Rainfall, Seismic Activity, Soil Moisture, river_level)
         # Target: 0=Safe, 1=Flood, 2=Landslide, 3=Earthquake
-        data = {
-            'rainfall_mm': np.random.normal(100, 30, 1000),
-            'seismic_magnitude': np.random.normal(2, 1, 1000),
-            'soil_moisture': np.random.normal(50, 15, 1000),
-            'river_level_m': np.random.normal(5, 2, 1000),
-            'risk_level': []
-        }
-        
-        # Generate logic-based labels for training
-        for i in range(1000):
-            r = data['rainfall_mm'][i]
-            s = data['seismic_magnitude'][i]
-            rv = data['river_level_m'][i]
-            
-            if s > 5.5: label = 3 # Quake
-            elif r > 180 or rv > 8: label = 1 # Flood
-            elif r > 150 and data['soil_moisture'][i] > 70: label = 2 # Landslide
-            else: label = 0 # Safe
-            data['risk_level'].append(label)
-
-        df = pd.DataFrame(data)
-        X = df[['rainfall_mm', 'seismic_magnitude', 'soil_moisture', 'river_level_m']]
-        y = df['risk_level']
-        
-        self.model.fit(X, y)
-
-    def predict_state_risk(self, state_name):
-        # Simulate live features for the state (In real app, fetch from IMD/USGS)
-        # Mocking values based on typical state profiles
-        profiles = {
-            "Tamil Nadu": [45, 1.2, 30, 4], # Currently calm
-            "Assam": [160, 3.4, 85, 7.8],   # Flood risk
-            "Uttarakhand": [140, 4.1, 75, 5], # Landslide risk
-            "Gujarat": [10, 2.1, 20, 2],    # Safe
-            "Maharashtra": [80, 2.5, 40, 5], # Moderate
-            "Kerala": [120, 1.5, 65, 6],     # Watch
-            "Delhi": [25, 1.1, 10, 3],       # Safe
-            "Odisha": [90, 1.3, 50, 6],      # Moderate
-        }
-        
-        features = profiles.get(state_name, [50, 2.0, 40, 4]) # Default
-        
+        n = self.n_samples
+        rng = np.random.default_rng(self.random_state)
+        X = np.column_stack([
+            rng.normal(100, 30, n),
+            rng.normal(2, 1, n),
+            rng.normal(50, 15, n),
+            rng.normal(5, 2, n),
+        ])
+        y = self.label_samples(X[:, 0], X[:, 1], X[:, 2], X[:, 3])
+
+        self.model.fit(pd.DataFrame(X, columns=FEATURE_COLUMNS), y)
+
+    def _features_for(self, state_names, table=None):
+        # Live per-state features from the feature store; baseline profiles until the first sync
+        if table is not None:
+            return table.rows(state_names)
+        return np.array([STATE_PROFILES.get(name, DEFAULT_PROFILE) for name in state_names], dtype=float)
+
+    def predict_states(self, state_names, features=None):
+        """
+        Scores many states with a single predict_proba call. Output matches predict_state_risk.
+        `features` is an optional FeatureTable; without it the baseline profiles are used.
+        """
+        state_names = list(state_names)
+        if not state_names:
+            return []
+        features = self._features_for(state_names, features)
+
+        # Results only depend on the model and the feature row, so repeat requests
+        # between syncs are served from the cache without running the forest
+        model_key = self.version or f"adhoc-{id(self.model)}"
+        keys = [
+            (model_key, name, hashlib.sha1(np.ascontiguousarray(row, dtype=np.float64).tobytes()).hexdigest())
+            for name, row in zip(state_names, features)
+        ]
+        results = [self._prediction_cache.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        CACHE_LOOKUPS.labels("predictions", "hit").inc(len(keys) - len(misses))
+        CACHE_LOOKUPS.labels("predictions", "miss").inc(len(misses))
+        if misses:
+            if len(self._prediction_cache) + len(misses) > self.max_cached_predictions:
+                self._prediction_cache.clear()
+            for i, result in zip(misses, self._score([state_names[i] for i in misses], features[misses])):
+                self._prediction_cache[keys[i]] = results[i] = result
+        return results
+
+    def _score(self, state_names, features):
         # Predict probabilities
-        risk_probs = self.model.predict_proba([features])[0]
-        # risk_probs order: [Safe, Flood, Landslide, Earthquake] (roughly)
-        
-        # Calculate Logic-based Safety Score (0-100) based on 'Safe' probability
-        safety_score = int(risk_probs[0] * 100) 
-        
-        # Determine likely disaster
-        disaster_types = ["None", "Flood", "Landslide", "Earthquake"]
-        likely_idx = np.argmax(risk_probs)
-        prediction = disaster_types[likely_idx] if likely_idx > 0 else "Safe"
-        
-        return {
-            "state": state_name,
-            "safety_score": safety_score,
-            "prediction": prediction,
-            "confidence": int(max(risk_probs) * 100),
-            "drivers": {
-                "rainfall": f"{features[0]}mm",
-                "seismic": f"{features[1]} M",
-                "soil_moisture": f"{features[2]}%",
-                "river_level": f"{features[3]}m"
-            }
-        }
+        with INFERENCE_SECONDS.labels("disaster_predictor").time():
+            probs = self.model.predict_proba(pd.DataFrame(features, columns=FEATURE_COLUMNS))
+        # Classes seen in training, in predict_proba column order
+        classes = self.model.classes_
+        safe_idx = np.flatnonzero(classes == 0)
+
+        results = []
+        for name, feats, risk_probs in zip(state_names, features, probs):
+            # Calculate Logic-based Safety Score (0-100) based on 'Safe' probability
+            safety_score = int(risk_probs[safe_idx[0]] * 100) if len(safe_idx) else 0
+
+            # Determine likely disaster
+            likely = int(classes[np.argmax(risk_probs)])
+            prediction = DISASTER_TYPES[likely] if likely > 0 else "Safe"
+
+            results.append({
+                "state": name,
+                "safety_score": safety_score,
+                "prediction": prediction,
+                "confidence": int(max(risk_probs) * 100),
+                "drivers": {
+                    "rainfall": f"{round(feats[0], 1):g}mm",
+                    "seismic": f"{round(feats[1], 1):g} M",
+                    "soil_moisture": f"{round(feats[2], 1):g}%",
+                    "river_level": f"{round(feats[3], 1):g}m"
+                }
+            })
+        return results
+
+    def predict_state_risk(self, state_name, features=None):
+        return self.predict_states([state_name], features)[0]
+
+if __name__ == "__main__":
+    # Train once and publish an artifact for the API workers:
+    #   python prediction_engine.py train [n_samples]
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) > 1 and sys.argv[1] == "train":
+        n_samples = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+        start = time.time()
+        predictor = DisasterPredictor(n_samples=n_samples)
+        path = predictor.save()
+        print(f"Trained on {n_samples} samples in {time.time() - start:.1f}s, saved {path}")
+    else:
+        print("Usage: python prediction_engine.py train [n_samples]")
@@ -0,0 +1,73 @@
+"""
+Startup profile of the API process: import time per module, from `python -X importtime`.
+
+    python profile_startup.py                 # top 25 modules when importing main
+    python profile_startup.py --top 50 --json startup.json
+    python profile_startup.py --module ml_service.lstm_model
+    python profile_startup.py --ml            # also time the first ML engine load
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def profile_imports(module, ml=False):
+    """Imports `module` in a fresh interpreter and returns (rows, wall seconds, ml seconds)."""
+    code = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {BACKEND_DIR!r})\n"
+        "started = time.perf_counter()\n"
+        f"import {module}\n"
+        "print('wall', time.perf_counter() - started)\n"
+    )
+    if ml:
+        code += (
+            "started = time.perf_counter()\n"
+            f"{module}.get_ml_engine()\n"
+            "print('ml', time.perf_counter() - started)\n"
+        )
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, cwd=BACKEND_DIR)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    timings = dict(line.split() for line in proc.stdout.splitlines() if line.startswith(("wall ", "ml ")))
+    return rows, float(timings["wall"]), float(timings["ml"]) if "ml" in timings else None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--ml", action="store_true", help="also time get_ml_engine() after the import")
+    parser.add_argument("--json", help="write the full per-module report to this file")
+    args = parser.parse_args()
+
+    rows, wall, ml_seconds = profile_imports(args.module, args.ml)
+    print(f"import {args.module}: {wall * 1000:.0f} ms wall, {len(rows)} modules")
+    if ml_seconds is not None:
+        print(f"first get_ml_engine(): {ml_seconds * 1000:.0f} ms")
+    print(f"\n{'cumulative ms':>14} {'self ms':>9}  module")
+    for row in sorted(rows, key=lambda r: r["cumulative_ms"], reverse=True)[:args.top]:
+        print(f"{row['cumulative_ms']:14.1f} {row['self_ms']:9.1f}  {'  ' * row['depth']}{row['module']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"module": args.module, "wall_seconds": wall, "ml_seconds": ml_seconds, "imports": rows}, f, indent=2)
+        print(f"\nFull report written to {args.json}")
+
+if __name__ == "__main__":
+    main()
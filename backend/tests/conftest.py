@@ -0,0 +1,11 @@
+"""
+Unit tests for code that can run without the upstream services. Run from backend/:
+    python -m pytest tests
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
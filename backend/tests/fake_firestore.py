@@ -0,0 +1,77 @@
+"""
+In-memory stand-in for the google-cloud-firestore client, covering the query surface
+FirestoreIngestor uses: collection(), where(), order_by(), limit(), start_after() and
+stream(). Ordering follows Firestore: documents without the order_by field are left
+out, and ties are broken by document id.
+"""
+import copy
+import operator
+
+OPERATORS = {"==": operator.eq, "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+class FakeQuery:
+    def __init__(self, db, name, filters=(), order=None, limit=None, after=None):
+        self._db = db
+        self._name = name
+        self._filters = tuple(filters)
+        self._order = order
+        self._limit = limit
+        self._after = after
+
+    def _copy(self, **changes):
+        fields = {"filters": self._filters, "order": self._order, "limit": self._limit, "after": self._after}
+        fields.update(changes)
+        return FakeQuery(self._db, self._name, **fields)
+
+    def where(self, field, op, value):
+        return self._copy(filters=self._filters + ((field, OPERATORS[op], value),))
+
+    def order_by(self, field):
+        return self._copy(order=field)
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, snapshot):
+        return self._copy(after=snapshot)
+
+    def _key(self, doc_id, data):
+        if self._order in (None, "__name__"):
+            return (doc_id,)
+        return (data[self._order], doc_id)
+
+    def stream(self):
+        self._db.stream_calls += 1
+        docs = []
+        for doc_id, data in self._db.collections.get(self._name, {}).items():
+            if self._order not in (None, "__name__") and self._order not in data:
+                continue
+            if all(field in data and op(data[field], value) for field, op, value in self._filters):
+                docs.append((self._key(doc_id, data), doc_id, data))
+        docs.sort(key=lambda d: d[0])
+        if self._after is not None:
+            cursor = self._key(self._after.id, self._after.to_dict())
+            docs = [d for d in docs if d[0] > cursor]
+        if self._limit is not None:
+            docs = docs[:self._limit]
+        self._db.docs_read += len(docs)
+        for _, doc_id, data in docs:
+            yield FakeSnapshot(doc_id, copy.deepcopy(data))
+
+class FakeFirestore:
+    """`collections` maps collection name -> {document id: data}; tests edit it directly."""
+    def __init__(self, collections=None):
+        self.collections = collections or {}
+        self.stream_calls = 0
+        self.docs_read = 0
+
+    def collection(self, name):
+        return FakeQuery(self, name)
@@ -0,0 +1,39 @@
+import time
+
+from collection_engine import CollectionEngine
+
+def sleeper(seconds, value="ok"):
+    def job():
+        time.sleep(seconds)
+        return value
+    return job
+
+def failing():
+    raise RuntimeError("upstream down")
+
+def test_every_job_is_either_a_result_or_a_failure():
+    engine = CollectionEngine(max_workers=4, deadline=0.3)
+    jobs = {"fast": sleeper(0), "slow": sleeper(2), "broken": failing, "edge": sleeper(0.29)}
+    results, failures = engine.run(jobs)
+    assert set(results) | set(failures) == set(jobs)
+    assert not set(results) & set(failures)
+    assert results["fast"] == "ok"
+    assert failures["slow"] == "timeout"
+    assert failures["broken"] == "upstream down"
+    engine.shutdown()
+
+def test_source_timeout_does_not_hold_the_run_to_the_deadline():
+    engine = CollectionEngine(max_workers=4, deadline=5, source_timeouts={"hung": 0.2})
+    started = time.monotonic()
+    results, failures = engine.run({"hung": sleeper(3), "weather:0": sleeper(0.1)})
+    assert time.monotonic() - started < 1
+    assert failures == {"hung": "timeout"}
+    assert results == {"weather:0": "ok"}
+    engine.shutdown()
+
+def test_source_timeout_applies_to_chunked_jobs():
+    engine = CollectionEngine(max_workers=4, deadline=5, source_timeouts={"weather": 0.2})
+    results, failures = engine.run({"weather:0": sleeper(3), "weather:1": sleeper(0)})
+    assert failures == {"weather:0": "timeout"}
+    assert results == {"weather:1": "ok"}
+    engine.shutdown()
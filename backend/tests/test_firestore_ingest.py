@@ -0,0 +1,110 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from ml_service.firestore_ingest import FirestoreIngestor
+from fake_firestore import FakeFirestore
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def make_docs(count):
+    return {
+        f"t{i:05d}": {"name": f"tourist {i}", "risk_score": i % 10, "updated_at": T0 + timedelta(minutes=i)}
+        for i in range(count)
+    }
+
+@pytest.fixture
+def db():
+    return FakeFirestore({"tourists": make_docs(1234)})
+
+@pytest.fixture
+def ingestor(db, tmp_path):
+    return FirestoreIngestor(db, cache_dir=str(tmp_path), page_size=100)
+
+def parts(tmp_path, name="tourists"):
+    return sorted(os.listdir(tmp_path / name))
+
+def test_first_sync_reads_every_document_in_pages(db, ingestor):
+    assert ingestor.sync("tourists") == 1234
+    # 12 full pages and one short page
+    assert db.stream_calls == 13
+    assert db.docs_read == 1234
+    assert len(ingestor.load("tourists")) == 1234
+
+@pytest.mark.parametrize("count, calls", [(200, 3), (201, 3), (99, 1)])
+def test_paging_across_the_page_size_boundary(tmp_path, count, calls):
+    db = FakeFirestore({"tourists": make_docs(count)})
+    ingestor = FirestoreIngestor(db, cache_dir=str(tmp_path), page_size=100)
+    assert ingestor.sync("tourists") == count
+    # A page exactly page_size long needs one more (empty) page to know it was the last
+    assert db.stream_calls == calls
+    assert ingestor.load("tourists")["doc_id"].is_unique
+
+def test_watermark_advances_and_persists(db, ingestor, tmp_path):
+    ingestor.sync("tourists")
+    assert ingestor.watermark("tourists") == T0 + timedelta(minutes=1233)
+
+    later = T0 + timedelta(days=1)
+    for i, doc_id in enumerate(["t00001", "t00500", "t01000"]):
+        db.collections["tourists"][doc_id].update(risk_score=99, updated_at=later + timedelta(minutes=i))
+    db.docs_read = 0
+
+    # A fresh instance resumes from state.json; the watermark query is inclusive,
+    # so the document at the old watermark is read again
+    resumed = FirestoreIngestor(db, cache_dir=str(tmp_path), page_size=100)
+    assert resumed.sync("tourists") == 4
+    assert db.docs_read == 4
+    assert resumed.watermark("tourists") == later + timedelta(minutes=2)
+
+    assert resumed.sync("tourists") == 1
+
+def test_load_keeps_newest_copy_of_each_document(db, ingestor):
+    ingestor.sync("tourists")
+    db.collections["tourists"]["t00042"].update(risk_score=77, updated_at=T0 + timedelta(days=2))
+    db.collections["tourists"]["t09999"] = {"name": "new", "risk_score": 1, "status": "active",
+                                           "updated_at": T0 + timedelta(days=3)}
+    ingestor.sync("tourists")
+
+    df = ingestor.load("tourists").set_index("doc_id")
+    assert len(df) == 1235
+    assert df.loc["t00042", "risk_score"] == 77
+    # Columns that only exist in later parts are read as missing for older rows
+    status = ingestor.load("tourists", columns=["status"]).set_index("doc_id")["status"]
+    assert status["t09999"] == "active"
+    assert status.isna().sum() == 1234
+
+def test_compact_merges_parts_without_changing_the_data(db, ingestor, tmp_path):
+    ingestor.sync("tourists")
+    for day in range(1, 4):
+        db.collections["tourists"]["t00007"].update(risk_score=day, updated_at=T0 + timedelta(days=day))
+        ingestor.sync("tourists")
+    assert len(parts(tmp_path)) == 4
+    before = ingestor.load("tourists").sort_values("doc_id").reset_index(drop=True)
+
+    ingestor.compact("tourists")
+    assert parts(tmp_path) == ["part-000004.parquet"]
+    after = ingestor.load("tourists").sort_values("doc_id").reset_index(drop=True)
+    assert after.equals(before)
+    assert after.set_index("doc_id").loc["t00007", "risk_score"] == 3
+
+def test_sync_compacts_past_max_parts(db, tmp_path):
+    ingestor = FirestoreIngestor(db, cache_dir=str(tmp_path), page_size=100, max_parts=2)
+    ingestor.sync("tourists")
+    for day in range(1, 3):
+        db.collections["tourists"]["t00003"]["updated_at"] = T0 + timedelta(days=day)
+        ingestor.sync("tourists")
+    assert len(parts(tmp_path)) == 1
+    assert len(ingestor.load("tourists")) == 1234
+
+def test_full_sync_drops_deleted_documents(db, ingestor):
+    ingestor.sync("tourists")
+    del db.collections["tourists"]["t00010"]
+    # Deletions are invisible to the watermark query
+    ingestor.sync("tourists")
+    assert len(ingestor.load("tourists")) == 1234
+
+    assert ingestor.sync("tourists", full=True) == 1233
+    assert "t00010" not in set(ingestor.load("tourists")["doc_id"])
@@ -0,0 +1,62 @@
+import time
+import threading
+from datetime import datetime, timedelta, timezone
+
+from collectors import gdacs_collector
+from collectors.gdacs_collector import GDACSCollector
+
+def feature(episode, days_left=5):
+    todate = (datetime.now(timezone.utc) + timedelta(days=days_left)).strftime("%Y-%m-%dT%H:%M:%S")
+    return {"properties": {"episodeid": episode, "eventtype": "FL", "alertlevel": "Orange",
+                           "datemodified": f"m{episode}", "todate": todate},
+            "geometry": {"coordinates": [78.0, 22.0]}}
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, features, delay=0):
+        self._features = features
+        self._delay = delay
+
+    def json(self):
+        time.sleep(self._delay)
+        return {"features": self._features}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+def collector(tmp_path, monkeypatch, feeds, delay=0):
+    monkeypatch.setattr(gdacs_collector, "ijson", None)
+    monkeypatch.setattr(gdacs_collector.http, "get", lambda *args, **kwargs: FakeResponse(feeds.pop(0), delay))
+    return GDACSCollector(index_path=str(tmp_path / "gdacs_index.json"))
+
+def test_active_episodes_missing_from_the_feed_are_not_resolved(tmp_path, monkeypatch):
+    gdacs = collector(tmp_path, monkeypatch, [[feature(1), feature(2, days_left=-5)], []])
+    assert len(gdacs.fetch_data()) == 2
+    assert [e["metadata"]["episode_id"] for e in gdacs.fetch_data()] == [1]
+    assert gdacs.last_changes["resolved"] == ["2"]
+
+def test_concurrent_fetches_run_one_at_a_time(tmp_path, monkeypatch):
+    # Already-ended episodes, so each feed fully replaces the previous one
+    feeds = [[feature(i, days_left=-1) for i in range(n, n + 50)] for n in range(0, 400, 50)]
+    gdacs = collector(tmp_path, monkeypatch, feeds, delay=0.01)
+    errors = []
+
+    def fetch():
+        try:
+            assert gdacs.fetch_data() is not None
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=fetch) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert not list(tmp_path.glob("*.tmp"))
+    assert len(GDACSCollector(index_path=str(tmp_path / "gdacs_index.json")).current_events()) == 50
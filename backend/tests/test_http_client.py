@@ -0,0 +1,44 @@
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from collectors.http_client import HttpClient
+
+class _RedirectHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/old":
+            self.send_response(302)
+            self.send_header("Location", "/new")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture(scope="module")
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RedirectHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+def test_http2_path_follows_redirects_like_requests(server):
+    pytest.importorskip("h2")
+    h1 = HttpClient(retries=0)
+    h2 = HttpClient(retries=0, http2=True)
+    assert h2.http2
+
+    plain = h1.get(f"{server}/old")
+    upgraded = h2.get(f"{server}/old")
+    assert plain.status_code == upgraded.status_code == 200
+    assert plain.json() == upgraded.json() == {"path": "/new"}
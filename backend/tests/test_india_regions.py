@@ -0,0 +1,45 @@
+import json
+import random
+
+from collectors.india_regions import RegionIndex, _point_in_ring
+
+def square(x, y, size):
+    return [[x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]]
+
+def write_layer(path, features):
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": [
+        {"type": "Feature", "properties": {"st_nm": name}, "geometry": geometry} for name, geometry in features
+    ]}))
+
+def enclave_index(tmp_path):
+    # B is a small enclave drawn on top of A (A has no matching hole, as when boundary
+    # sets do not line up exactly); B's edges lie in cells that are otherwise interior to A
+    write_layer(tmp_path / "states.geojson", [
+        ("B", {"type": "Polygon", "coordinates": [square(75.05, 15.05, 0.1)]}),
+        ("A", {"type": "Polygon", "coordinates": [square(70, 10, 10)]}),
+    ])
+    index = RegionIndex(states_path=str(tmp_path / "states.geojson"),
+                        districts_path=str(tmp_path / "missing.geojson"))
+    assert index.load()
+    return index
+
+def expected(lon, lat):
+    if 75.05 < lon < 75.15 and 15.05 < lat < 15.15:
+        return "B"
+    return "A" if _point_in_ring(lon, lat, square(70, 10, 10)) else None
+
+def test_polygon_with_another_polygons_edge_in_its_interior_cell(tmp_path):
+    index = enclave_index(tmp_path)
+    # Same 0.25 degree cell as B's edges, but outside B
+    assert index.locate(15.01, 75.01) == ("A", None)
+    assert index.locate(15.1, 75.1) == ("B", None)
+    assert index.locate(25.0, 75.0) == (None, None)
+
+def test_vectorized_lookup_matches_brute_force(tmp_path):
+    index = enclave_index(tmp_path)
+    rng = random.Random(3)
+    points = [(rng.uniform(14.9, 15.3), rng.uniform(74.9, 75.3)) for _ in range(3000)]
+    points += [(rng.uniform(9, 21), rng.uniform(69, 81)) for _ in range(3000)]
+    located = index.locate_many(points)
+    assert [state for state, _ in located] == [expected(lon, lat) for lat, lon in points]
+    assert [index.locate(lat, lon)[0] for lat, lon in points[:500]] == [expected(lon, lat) for lat, lon in points[:500]]
@@ -0,0 +1,29 @@
+import time
+import random
+
+from collectors.osm_index import InfrastructureIndex, haversine_m
+
+def build_index(tmp_path, count=2000, seed=7):
+    rng = random.Random(seed)
+    index = InfrastructureIndex(index_path=str(tmp_path / "index.json"))
+    index._upsert([
+        {"type": "node", "id": i, "lat": rng.uniform(8, 35), "lon": rng.uniform(68, 97), "tags": {"amenity": "hospital"}}
+        for i in range(count)
+    ], replace=True)
+    return index
+
+def brute_force(index, lat, lon, radius_m):
+    return sorted(n["id"] for n in index.nodes.values() if haversine_m(lat, lon, n["lat"], n["lon"]) <= radius_m)
+
+def test_within_radius_matches_brute_force(tmp_path):
+    index = build_index(tmp_path)
+    for lat, lon, radius in [(20.0, 80.0, 50000), (28.6, 77.2, 200000), (10.0, 95.0, 5000)]:
+        assert sorted(n["id"] for _, n in index.within_radius(lat, lon, radius)) == brute_force(index, lat, lon, radius)
+
+def test_huge_radius_near_the_pole_stays_cheap(tmp_path):
+    index = build_index(tmp_path)
+    started = time.process_time()
+    hits = index.within_radius(89.9, 77.0, 20000000)
+    assert time.process_time() - started < 1
+    assert len(hits) == len(index.nodes)
+    assert sorted(n["id"] for _, n in index.within_radius(85.0, 77.0, 6000000)) == brute_force(index, 85.0, 77.0, 6000000)
@@ -0,0 +1,28 @@
+from collectors import weather_collector
+from collectors.weather_collector import WeatherCollector
+
+def location(wind=10.0, precip=1.0):
+    return {"current": {"temperature_2m": 30.0, "wind_speed_10m": wind, "precipitation": precip},
+            "daily": {"precipitation_sum": [4.0]}}
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+def test_null_wind_and_precipitation_count_as_zero():
+    parsed = WeatherCollector()._parse(10.0, 77.0, location(wind=None, precip=None))
+    assert parsed["risk_level"] == "Low"
+    assert parsed["wind_kph"] is None
+
+def test_one_malformed_location_does_not_null_its_chunk(monkeypatch):
+    payload = [location(wind=60.0), {"current": "garbage"}, location(wind=None)]
+    monkeypatch.setattr(weather_collector.http, "get", lambda *args, **kwargs: FakeResponse(payload))
+    results = WeatherCollector().fetch_weather_batch([(10.0, 77.0), (11.0, 78.0), (12.0, 79.0)])
+    assert results[0]["risk_level"] == "High"
+    assert results[1] is None
+    assert results[2]["risk_level"] == "Low"